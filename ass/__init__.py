@@ -17,13 +17,12 @@
 import ctypes
 from collections import namedtuple
 
-import numpy
-
 from .enums import *
 from .libass import ASS_Event, ASS_Image, ASS_Style, ass_library_version
 from .library import ASS_Library
-from .renderer import ASS_Renderer
+from .renderer import ASS_Renderer, RendererConfig
 from .track import ASS_Track
+from .utils import LibassError
 
 __all__ = [
     "get_version_info",
@@ -31,6 +30,7 @@ __all__ = [
     "ASS_Library",
     "ASS_Renderer",
     "ASS_Track",
+    "RendererConfig",
     "ASS_HINTING_NONE",
     "ASS_HINTING_LIGHT",
     "ASS_HINTING_NORMAL",
@@ -111,16 +111,75 @@ ASS_Event.effect = property(_get_effect)
 ASS_Event.text = property(_get_text)
 
 
+def _check_image(ass_image):
+    renderer = getattr(ass_image, "_pyass_renderer", None)
+    if (
+        renderer is not None
+        and renderer._generation != ass_image._pyass_generation
+    ):
+        raise LibassError(
+            "ASS_Image used after the next ass_render_frame call"
+        )
+
+
 def _get_image(ass_image):
+    import numpy
+
+    _check_image(ass_image)
     return numpy.ctypeslib.as_array(
         ass_image.bitmap, shape=(ass_image.stride * ass_image.h,)
     )
 
 
-def _get_next_image(ass_image):
-    next_img = ass_image.next
-    return None if not next_img else next_img[0]
+def _get_bitmap2d(ass_image):
+    import numpy
+
+    _check_image(ass_image)
+    if not ass_image.bitmap:
+        return numpy.zeros((ass_image.h, ass_image.w), dtype=numpy.uint8)
+    return numpy.ctypeslib.as_array(
+        ass_image.bitmap, shape=(ass_image.h, ass_image.stride)
+    )[:, : ass_image.w]
+
+
+def _get_bitmap_buffer(ass_image):
+    _check_image(ass_image)
+    size = ass_image.stride * ass_image.h
+    if not ass_image.bitmap:
+        import numpy
+
+        # memoryview.cast() rejects shapes with zeros
+        return memoryview(
+            numpy.zeros((ass_image.h, ass_image.stride), dtype=numpy.uint8)
+        )
+    buf = (ctypes.c_uint8 * size).from_address(
+        ctypes.addressof(ass_image.bitmap.contents)
+    )
+    return memoryview(buf).cast("B", (ass_image.h, ass_image.stride))
 
 
+def _get_next_image(ass_image):
+    next_img = ass_image.next
+    if not next_img:
+        return None
+    next_img = next_img[0]
+    renderer = getattr(ass_image, "_pyass_renderer", None)
+    if renderer is not None:
+        next_img._pyass_renderer = renderer
+        next_img._pyass_generation = ass_image._pyass_generation
+    return next_img
+
+
+# The bitmap views share the memory of libass and are valid only until the
+# next ass_render_frame call of the renderer that produced the image. Set the
+# PYASS_DEBUG environment variable to detect images used after that call.
 ASS_Image.image = property(_get_image)
+ASS_Image.bitmap2d = property(
+    _get_bitmap2d,
+    doc="Zero-copy (h, w) numpy view of the bitmap, with the bitmap stride.",
+)
+ASS_Image.bitmap_buffer = property(
+    _get_bitmap_buffer,
+    doc="Zero-copy (h, stride) memoryview of the bitmap.",
+)
 ASS_Image.next_image = property(_get_next_image)
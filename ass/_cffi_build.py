@@ -0,0 +1,41 @@
+"""Build the optional cffi backend of ass.libass
+
+Run this file, or install with the PYASS_CFFI environment variable set, to
+compile the ass._libass_cffi extension. The libass headers and library must
+be reachable by the C compiler (see CFLAGS and LDFLAGS).
+"""
+
+from cffi import FFI
+
+ffibuilder = FFI()
+
+ffibuilder.set_source(
+    "ass._libass_cffi", "#include <ass/ass.h>", libraries=["ass"]
+)
+
+# Functions with plain arguments, called often enough for the ctypes argument
+# conversion to show up in profiles
+ffibuilder.cdef(
+    """
+    typedef ... ASS_Library;
+    typedef ... ASS_Renderer;
+    typedef ... ASS_Track;
+
+    int ass_library_version(void);
+
+    void ass_set_frame_size(ASS_Renderer *priv, int w, int h);
+    void ass_set_storage_size(ASS_Renderer *priv, int w, int h);
+    void ass_set_cache_limits(ASS_Renderer *priv, int glyph_max,
+                              int bitmap_max_size);
+
+    void ass_process_data(ASS_Track *track, char *data, int size);
+    void ass_process_chunk(ASS_Track *track, char *data, int size,
+                           long long timecode, long long duration);
+    void ass_set_check_readorder(ASS_Track *track, int check_readorder);
+    void ass_flush_events(ASS_Track *track);
+    long long ass_step_sub(ASS_Track *track, long long now, int movement);
+    """
+)
+
+if __name__ == "__main__":
+    ffibuilder.compile(verbose=True)
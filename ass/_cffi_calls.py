@@ -0,0 +1,103 @@
+#   © 2019 Luni-4 <luni-4@hotmail.it>
+#   https://github.com/bubblesub/pyass
+#
+#   This program is free software: you can redistribute it and/or modify it
+#   under the terms of the GNU Lesser General Public License as published
+#   by the Free Software Foundation, either version 3 of the License,
+#   or (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty
+#   of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#   See the GNU Lesser General Public License for more details.
+#
+#   You should have received a copy of the GNU Lesser General Public License
+#   along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""cffi implementation of the hot functions of ass.libass.
+
+The functions take the same arguments as their ctypes counterparts: ctypes
+handles are converted once to cffi pointers and the result is cached on the
+ctypes pointer object.
+"""
+
+import ctypes
+
+from ._libass_cffi import ffi, lib
+
+
+def _get_address(pointer):
+    return ctypes.cast(pointer, ctypes.c_void_p).value or 0
+
+
+def _handle_converter(ctype):
+    def convert(pointer):
+        try:
+            return pointer._pyass_cffi_handle
+        except AttributeError:
+            handle = ffi.cast(ctype, _get_address(pointer))
+            pointer._pyass_cffi_handle = handle
+            return handle
+
+    return convert
+
+
+_renderer = _handle_converter("ASS_Renderer *")
+_track = _handle_converter("ASS_Track *")
+
+
+def _data(data):
+    if isinstance(data, bytes):
+        return data
+    return ffi.cast("char *", _get_address(data))
+
+
+def ass_set_frame_size(priv, w, h):
+    lib.ass_set_frame_size(_renderer(priv), w, h)
+
+
+def ass_set_storage_size(priv, w, h):
+    lib.ass_set_storage_size(_renderer(priv), w, h)
+
+
+def ass_set_cache_limits(priv, glyph_max, bitmap_max_size):
+    lib.ass_set_cache_limits(_renderer(priv), glyph_max, bitmap_max_size)
+
+
+def ass_process_data(track, data, size):
+    lib.ass_process_data(_track(track), _data(data), size)
+
+
+def ass_process_chunk(track, data, size, timecode, duration):
+    lib.ass_process_chunk(
+        _track(track), _data(data), size, timecode, duration
+    )
+
+
+def ass_set_check_readorder(track, check_readorder):
+    lib.ass_set_check_readorder(_track(track), check_readorder)
+
+
+def ass_flush_events(track):
+    lib.ass_flush_events(_track(track))
+
+
+def ass_step_sub(track, now, movement):
+    return lib.ass_step_sub(_track(track), now, movement)
+
+
+FUNCTIONS = {
+    func.__name__: func
+    for func in (
+        ass_set_frame_size,
+        ass_set_storage_size,
+        ass_set_cache_limits,
+        ass_process_data,
+        ass_process_chunk,
+        ass_set_check_readorder,
+        ass_flush_events,
+        ass_step_sub,
+    )
+}
+# Functions without handle arguments need no wrapper
+FUNCTIONS["ass_library_version"] = lib.ass_library_version
@@ -0,0 +1,155 @@
+#   © 2019 Luni-4 <luni-4@hotmail.it>
+#   https://github.com/bubblesub/pyass
+#
+#   This program is free software: you can redistribute it and/or modify it
+#   under the terms of the GNU Lesser General Public License as published
+#   by the Free Software Foundation, either version 3 of the License,
+#   or (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty
+#   of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#   See the GNU Lesser General Public License for more details.
+#
+#   You should have received a copy of the GNU Lesser General Public License
+#   along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""numpy structured arrays over libass structs.
+"""
+
+import ctypes
+import sys
+from collections import namedtuple
+
+import numpy
+from numpy.lib import recfunctions
+
+from .libass import ASS_Event, ASS_Image, ASS_Style
+
+__all__ = [
+    "struct_dtype",
+    "struct_array",
+    "EVENT_DTYPE",
+    "STYLE_DTYPE",
+    "IMAGE_DTYPE",
+    "SNAPSHOT_DTYPE",
+    "SnapshotImage",
+    "image_array",
+    "iter_snapshot",
+]
+
+
+def struct_dtype(struct):
+    """Build a numpy dtype with the memory layout of a ctypes structure.
+
+    Pointer fields, strings included, become uintp addresses.
+
+    :param struct: ctypes.Structure subclass
+    :return: numpy structured dtype
+    """
+    names, formats, offsets = [], [], []
+    for name, ctype in struct._fields_:
+        names.append(name)
+        if issubclass(
+            ctype, (ctypes._Pointer, ctypes.c_char_p, ctypes.c_void_p)
+        ):
+            formats.append(numpy.uintp)
+        else:
+            formats.append(numpy.dtype(ctype))
+        offsets.append(getattr(struct, name).offset)
+    return numpy.dtype(
+        {
+            "names": names,
+            "formats": formats,
+            "offsets": offsets,
+            "itemsize": ctypes.sizeof(struct),
+        }
+    )
+
+
+def struct_array(pointer, count, dtype):
+    """View a C array of structs as a numpy structured array, without copy.
+
+    :param pointer: ctypes pointer to the first struct
+    :param count: number of structs
+    :param dtype: dtype built by struct_dtype() for the struct type
+    :return: numpy array sharing the memory of the C array
+    """
+    if not count or not pointer:
+        return numpy.empty(0, dtype)
+    buf = (ctypes.c_char * (count * dtype.itemsize)).from_address(
+        ctypes.cast(pointer, ctypes.c_void_p).value
+    )
+    return numpy.frombuffer(buf, dtype=dtype)
+
+
+EVENT_DTYPE = struct_dtype(ASS_Event)
+STYLE_DTYPE = struct_dtype(ASS_Style)
+IMAGE_DTYPE = struct_dtype(ASS_Image)
+
+_SNAPSHOT_FIELDS = (
+    "w",
+    "h",
+    "stride",
+    "color",
+    "dst_x",
+    "dst_y",
+    "type",
+    "bitmap",
+)
+
+SNAPSHOT_DTYPE = recfunctions.repack_fields(
+    numpy.empty(0, IMAGE_DTYPE)[list(_SNAPSHOT_FIELDS)]
+).dtype
+
+
+def image_array(image):
+    """Copy the fields of a list of ASS_Image into a structured array.
+
+    The bitmap field holds the address of the bitmap, which is valid only
+    until the next ass_render_frame call.
+
+    :param image: first ASS_Image of the list, or None
+    :return: numpy array of SNAPSHOT_DTYPE, one element per image
+    """
+    size = IMAGE_DTYPE.itemsize
+    next_offset = ASS_Image.next.offset
+    next_end = next_offset + ctypes.sizeof(ctypes.c_void_p)
+
+    chunks = []
+    address = 0 if image is None else ctypes.addressof(image)
+    while address:
+        chunk = ctypes.string_at(address, size)
+        chunks.append(chunk)
+        address = int.from_bytes(chunk[next_offset:next_end], sys.byteorder)
+
+    images = numpy.frombuffer(b"".join(chunks), dtype=IMAGE_DTYPE)
+    return recfunctions.repack_fields(images[list(_SNAPSHOT_FIELDS)])
+
+
+class SnapshotImage(namedtuple("SnapshotImage", _SNAPSHOT_FIELDS)):
+    """One element of an image_array() snapshot.
+    """
+
+    __slots__ = ()
+
+    @property
+    def bitmap2d(self):
+        """Zero-copy (h, w) numpy view of the bitmap.
+        """
+        if not self.bitmap:
+            return numpy.zeros((self.h, self.w), dtype=numpy.uint8)
+        return numpy.ctypeslib.as_array(
+            ctypes.cast(self.bitmap, ctypes.POINTER(ctypes.c_uint8)),
+            shape=(self.h, self.stride),
+        )[:, : self.w]
+
+
+def iter_snapshot(images):
+    """Iterate over the elements of an image_array() snapshot.
+
+    :param images: numpy array of SNAPSHOT_DTYPE
+    :return: generator of SnapshotImage objects
+    """
+    for fields in images.tolist():
+        yield SnapshotImage(*fields)
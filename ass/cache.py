@@ -0,0 +1,322 @@
+#   © 2019 Luni-4 <luni-4@hotmail.it>
+#   https://github.com/bubblesub/pyass
+#
+#   This program is free software: you can redistribute it and/or modify it
+#   under the terms of the GNU Lesser General Public License as published
+#   by the Free Software Foundation, either version 3 of the License,
+#   or (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty
+#   of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#   See the GNU Lesser General Public License for more details.
+#
+#   You should have received a copy of the GNU Lesser General Public License
+#   along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Adaptive cache limits of renderers.
+"""
+
+import ctypes
+import os
+import sys
+import warnings
+from collections import deque, namedtuple
+
+__all__ = ["AdaptiveCacheLimits", "CacheAdjustment", "get_rss"]
+
+# libass defaults, used when ass_set_cache_limits is never called
+DEFAULT_GLYPH_MAX = 10000
+DEFAULT_BITMAP_MAX_SIZE = 128
+
+# Function reading the resident set size on this platform, made on first use
+_rss_reader = None
+
+CacheAdjustment = namedtuple(
+    "CacheAdjustment",
+    ("frame", "glyph_max", "bitmap_max_size", "latency_ms", "rss", "reason"),
+)
+
+
+def _unknown_rss():
+    return None
+
+
+def _read_statm():
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def _make_windows_reader():
+    from ctypes import wintypes
+
+    class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+        _fields_ = [
+            ("cb", wintypes.DWORD),
+            ("PageFaultCount", wintypes.DWORD),
+            ("PeakWorkingSetSize", ctypes.c_size_t),
+            ("WorkingSetSize", ctypes.c_size_t),
+            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+            ("PagefileUsage", ctypes.c_size_t),
+            ("PeakPagefileUsage", ctypes.c_size_t),
+        ]
+
+    kernel32 = ctypes.WinDLL("kernel32")
+    get_current_process = kernel32.GetCurrentProcess
+    get_current_process.restype = wintypes.HANDLE
+    get_current_process.argtypes = []
+    # Exported by kernel32 since Windows 7, by psapi before
+    try:
+        get_memory_info = kernel32.K32GetProcessMemoryInfo
+    except AttributeError:
+        get_memory_info = ctypes.WinDLL("psapi").GetProcessMemoryInfo
+    get_memory_info.restype = wintypes.BOOL
+    get_memory_info.argtypes = [
+        wintypes.HANDLE,
+        ctypes.POINTER(PROCESS_MEMORY_COUNTERS),
+        wintypes.DWORD,
+    ]
+
+    def read():
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        if not get_memory_info(
+            get_current_process(), ctypes.byref(counters), counters.cb
+        ):
+            return None
+        return counters.WorkingSetSize
+
+    return read
+
+
+def _make_mach_reader():
+    from ctypes.util import find_library
+
+    class time_value_t(ctypes.Structure):
+        _fields_ = [
+            ("seconds", ctypes.c_int),
+            ("microseconds", ctypes.c_int),
+        ]
+
+    class mach_task_basic_info(ctypes.Structure):
+        _pack_ = 4
+        _fields_ = [
+            ("virtual_size", ctypes.c_uint64),
+            ("resident_size", ctypes.c_uint64),
+            ("resident_size_max", ctypes.c_uint64),
+            ("user_time", time_value_t),
+            ("system_time", time_value_t),
+            ("policy", ctypes.c_int),
+            ("suspend_count", ctypes.c_int),
+        ]
+
+    MACH_TASK_BASIC_INFO = 20
+    KERN_SUCCESS = 0
+
+    libc = ctypes.CDLL(find_library("c"))
+    mach_task_self = libc.mach_task_self
+    mach_task_self.restype = ctypes.c_uint
+    mach_task_self.argtypes = []
+    task_info = libc.task_info
+    task_info.restype = ctypes.c_int
+    task_info.argtypes = [
+        ctypes.c_uint,
+        ctypes.c_int,
+        ctypes.POINTER(mach_task_basic_info),
+        ctypes.POINTER(ctypes.c_uint),
+    ]
+
+    def read():
+        info = mach_task_basic_info()
+        # Size in natural_t units
+        count = ctypes.c_uint(ctypes.sizeof(info) // 4)
+        if (
+            task_info(
+                mach_task_self(),
+                MACH_TASK_BASIC_INFO,
+                ctypes.byref(info),
+                ctypes.byref(count),
+            )
+            != KERN_SUCCESS
+        ):
+            return None
+        return info.resident_size
+
+    return read
+
+
+def _make_reader():
+    if sys.platform == "win32":
+        return _make_windows_reader()
+    if sys.platform == "darwin":
+        return _make_mach_reader()
+    return _read_statm
+
+
+def get_rss():
+    """Return the current resident set size of the process.
+
+    It is read from /proc on Linux, with GetProcessMemoryInfo() on Windows
+    and task_info() on macOS. The peak resident set size of getrusage() is
+    not used instead: it never goes down, so a budget once exceeded would
+    stay exceeded.
+
+    :return: size in bytes, or None if unknown
+    """
+    global _rss_reader
+    if _rss_reader is None:
+        try:
+            _rss_reader = _make_reader()
+        except (OSError, AttributeError):
+            # Missing system library or function
+            _rss_reader = _unknown_rss
+    try:
+        return _rss_reader()
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _clamp(value, bounds):
+    return max(bounds[0], min(bounds[1], int(value)))
+
+
+class AdaptiveCacheLimits:
+    """Adjust the glyph and bitmap cache limits of a renderer while it renders.
+
+    libass does not report cache hit rates, so render latency stands in for
+    them. After every window of frames:
+
+    - when the process uses more memory than memory_limit, the limits shrink;
+    - when the 90th percentile of the latency is above target_ms and the
+      memory allows it, the limits grow;
+    - when it is below a quarter of target_ms, the limits shrink, to give
+      back the memory simple scripts do not need.
+
+    The resident set size is the one of the whole process, shared by all its
+    renderers. Where it is unknown, memory_limit is ignored and a
+    RuntimeWarning is issued.
+    """
+
+    def __init__(
+        self,
+        glyph_bounds=(1000, 40000),
+        bitmap_bounds=(16, 1024),
+        memory_limit=None,
+        target_ms=20.0,
+        window=120,
+        factor=1.5,
+        history=64,
+        initial=None,
+    ):
+        """Set the policy.
+
+        :param glyph_bounds: (min, max) number of cached glyphs
+        :param bitmap_bounds: (min, max) bitmap cache size in MB
+        :param memory_limit: resident set size budget of the process in
+                             bytes, None for no budget
+        :param target_ms: render latency above which the caches grow
+        :param window: number of frames between two adjustments
+        :param factor: ratio applied to the limits by one adjustment
+        :param history: number of adjustments kept
+        :param initial: (glyph_max, bitmap_max_size) limits to start from,
+                        the libass defaults if omitted; zeros also stand for
+                        the defaults, as in ass_set_cache_limits()
+        """
+        if factor <= 1:
+            raise ValueError("factor must be greater than 1")
+        self.glyph_bounds = glyph_bounds
+        self.bitmap_bounds = bitmap_bounds
+        self.memory_limit = memory_limit
+        if memory_limit is not None and get_rss() is None:
+            warnings.warn(
+                "The resident set size of the process is unknown, "
+                "memory_limit is ignored",
+                RuntimeWarning,
+                stacklevel=2,
+            )
+        self.target_ms = target_ms
+        self.window = window
+        self.factor = factor
+        glyph_max, bitmap_max_size = initial or (0, 0)
+        self.glyph_max = _clamp(glyph_max or DEFAULT_GLYPH_MAX, glyph_bounds)
+        self.bitmap_max_size = _clamp(
+            bitmap_max_size or DEFAULT_BITMAP_MAX_SIZE, bitmap_bounds
+        )
+        self.history = deque(maxlen=history)
+        self._latencies = []
+        self._frames = 0
+
+    @property
+    def limits(self):
+        """Current (glyph_max, bitmap_max_size) limits.
+        """
+        return self.glyph_max, self.bitmap_max_size
+
+    def apply(self, renderer):
+        """Set the current limits on a renderer.
+
+        :param renderer: ASS_Renderer
+        """
+        renderer.ass_set_cache_limits(self.glyph_max, self.bitmap_max_size)
+
+    def record(self, renderer, wall_ns):
+        """Account for a rendered frame, adjusting the limits of the renderer
+           at the end of a window.
+
+        :param renderer: ASS_Renderer that rendered the frame
+        :param wall_ns: rendering time in nanoseconds
+        """
+        self._frames += 1
+        self._latencies.append(wall_ns)
+        if len(self._latencies) < self.window:
+            return
+
+        latencies = sorted(self._latencies)
+        self._latencies = []
+        latency_ms = latencies[int(0.9 * (len(latencies) - 1))] / 1e6
+        rss = get_rss()
+
+        over_budget = (
+            self.memory_limit is not None
+            and rss is not None
+            and rss > self.memory_limit
+        )
+        if over_budget:
+            scale, reason = 1 / self.factor, "memory"
+        elif latency_ms > self.target_ms:
+            # Leave room for the caches to fill before the budget is hit
+            if (
+                self.memory_limit is not None
+                and rss is not None
+                and rss > 0.9 * self.memory_limit
+            ):
+                return
+            scale, reason = self.factor, "latency"
+        elif latency_ms < self.target_ms / 4:
+            scale, reason = 1 / self.factor, "idle"
+        else:
+            return
+
+        glyph_max = _clamp(self.glyph_max * scale, self.glyph_bounds)
+        bitmap_max_size = _clamp(
+            self.bitmap_max_size * scale, self.bitmap_bounds
+        )
+        if (glyph_max, bitmap_max_size) == self.limits:
+            return
+
+        self.glyph_max = glyph_max
+        self.bitmap_max_size = bitmap_max_size
+        self.apply(renderer)
+        self.history.append(
+            CacheAdjustment(
+                self._frames,
+                glyph_max,
+                bitmap_max_size,
+                latency_ms,
+                rss,
+                reason,
+            )
+        )
@@ -0,0 +1,313 @@
+#   © 2019 Luni-4 <luni-4@hotmail.it>
+#   https://github.com/bubblesub/pyass
+#
+#   This program is free software: you can redistribute it and/or modify it
+#   under the terms of the GNU Lesser General Public License as published
+#   by the Free Software Foundation, either version 3 of the License,
+#   or (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty
+#   of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#   See the GNU Lesser General Public License for more details.
+#
+#   You should have received a copy of the GNU Lesser General Public License
+#   along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Blend lists of ASS_Image onto numpy frames.
+"""
+
+import numpy
+
+from . import enums
+from .arrays import iter_snapshot
+from .utils import LibassError
+
+__all__ = ["blend", "blend_yuv", "color_to_yuv", "to_rgba"]
+
+# Position of the red, green, blue and alpha channels for each pixel format
+_PIXEL_FORMATS = {
+    "RGB": (0, 1, 2, None),
+    "BGR": (2, 1, 0, None),
+    "RGBA": (0, 1, 2, 3),
+    "BGRA": (2, 1, 0, 3),
+}
+
+# 255 * 255, the scale of the product between coverage and opacity
+_MAX_COVERAGE = 65025
+
+# Luma coefficients (Kr, Kb) and whether the range is full, for each
+# YCbCrMatrix value
+_YCBCR_MATRICES = {
+    enums.YCBCR_BT601_TV: (0.299, 0.114, False),
+    enums.YCBCR_BT601_PC: (0.299, 0.114, True),
+    enums.YCBCR_BT709_TV: (0.2126, 0.0722, False),
+    enums.YCBCR_BT709_PC: (0.2126, 0.0722, True),
+    enums.YCBCR_SMPTE240M_TV: (0.212, 0.087, False),
+    enums.YCBCR_SMPTE240M_PC: (0.212, 0.087, True),
+    enums.YCBCR_FCC_TV: (0.30, 0.11, False),
+    enums.YCBCR_FCC_PC: (0.30, 0.11, True),
+}
+
+# Number of planes, sample type and bit shift of the samples for each YUV
+# pixel format; chroma is always subsampled by two in both directions
+_YUV_FORMATS = {
+    "I420": (3, numpy.uint8, 0),
+    "NV12": (2, numpy.uint8, 0),
+    "P010": (2, numpy.uint16, 6),
+}
+
+
+def _clip(image, height, width):
+    """Clip an ASS_Image against the frame area.
+
+    :param image: ASS_Image
+    :param height: frame height
+    :param width: frame width
+    :return: bitmap view and the destination slices, or None if the image
+             lies outside of the frame
+    """
+    x0 = max(image.dst_x, 0)
+    y0 = max(image.dst_y, 0)
+    x1 = min(image.dst_x + image.w, width)
+    y1 = min(image.dst_y + image.h, height)
+    if x0 >= x1 or y0 >= y1:
+        return None
+
+    src = image.bitmap2d[
+        y0 - image.dst_y : y1 - image.dst_y,
+        x0 - image.dst_x : x1 - image.dst_x,
+    ]
+    return src, slice(y0, y1), slice(x0, x1)
+
+
+def _iter_images(image):
+    if isinstance(image, numpy.ndarray):
+        yield from iter_snapshot(image)
+        return
+    while image is not None:
+        yield image
+        image = image.next_image
+
+
+def _blend_single(image, frame, channels):
+    opacity = 255 - (image.color & 0xFF)
+    if not opacity:
+        return
+
+    clipped = _clip(image, frame.shape[0], frame.shape[1])
+    if clipped is None:
+        return
+    src, rows, cols = clipped
+
+    k = src.astype(numpy.uint32) * opacity
+    inv_k = _MAX_COVERAGE - k
+    r, g, b, a = channels
+    colors = (
+        (r, image.color >> 24),
+        (g, (image.color >> 16) & 0xFF),
+        (b, (image.color >> 8) & 0xFF),
+    )
+    if a is None:
+        for channel, value in colors:
+            dst = frame[rows, cols, channel]
+            frame[rows, cols, channel] = (
+                k * value + inv_k * dst + _MAX_COVERAGE // 2
+            ) // _MAX_COVERAGE
+        return
+
+    # Straight alpha "over": the destination color counts in proportion to
+    # its own alpha, so a transparent destination takes the image color
+    src_weight = k.astype(numpy.uint64) * 255
+    dst_weight = inv_k * frame[rows, cols, a].astype(numpy.uint64)
+    total = src_weight + dst_weight
+    nonzero = numpy.maximum(total, 1)
+    for channel, value in colors:
+        dst = frame[rows, cols, channel]
+        frame[rows, cols, channel] = numpy.where(
+            total,
+            (value * src_weight + dst * dst_weight + nonzero // 2) // nonzero,
+            dst,
+        )
+    frame[rows, cols, a] = (total + _MAX_COVERAGE // 2) // _MAX_COVERAGE
+
+
+def blend(image, frame, pixel_format="RGB"):
+    """Blend a list of ASS_Image onto a frame, in place.
+
+    RGBA and BGRA frames hold straight (not premultiplied) alpha.
+
+    :param image: first ASS_Image of the list, an image_array() snapshot
+                  or None
+    :param frame: uint8 numpy array of shape (height, width, channels)
+    :param pixel_format: channel order of the frame, one of "RGB", "BGR",
+                         "RGBA" or "BGRA"
+    :return: number of blended images
+    """
+    try:
+        channels = _PIXEL_FORMATS[pixel_format]
+    except KeyError:
+        raise LibassError("Unknown pixel format {!r}".format(pixel_format))
+
+    if (
+        frame.dtype != numpy.uint8
+        or frame.ndim != 3
+        or frame.shape[2] != len(pixel_format)
+    ):
+        raise LibassError(
+            "Frame must be a uint8 array of shape (height, width, {})".format(
+                len(pixel_format)
+            )
+        )
+
+    count = 0
+    for item in _iter_images(image):
+        _blend_single(item, frame, channels)
+        count += 1
+    return count
+
+
+def to_rgba(image, width, height):
+    """Blend a list of ASS_Image onto a new transparent RGBA frame, with
+       straight alpha as expected by PIL "RGBA" images.
+
+    :param image: first ASS_Image of the list, an image_array() snapshot
+                  or None
+    :param width: frame width
+    :param height: frame height
+    :return: uint8 numpy array of shape (height, width, 4)
+    """
+    frame = numpy.zeros((height, width, 4), dtype=numpy.uint8)
+    blend(image, frame, "RGBA")
+    return frame
+
+
+def color_to_yuv(color, matrix, video_matrix=enums.YCBCR_BT601_TV):
+    """Convert an ASS_Image color to 8-bit Y, U and V values.
+
+    :param color: RGBA color of an ASS_Image
+    :param matrix: YCbCrMatrix of the track
+    :param video_matrix: matrix of the video, used when the track asks for
+                         no color mangling (YCBCR_NONE)
+    :return: tuple of Y, U and V values as floats
+    """
+    if matrix == enums.YCBCR_NONE:
+        matrix = video_matrix
+    try:
+        kr, kb, full_range = _YCBCR_MATRICES[matrix]
+    except KeyError:
+        # YCBCR_DEFAULT and YCBCR_UNKNOWN are rendered as TV.601
+        kr, kb, full_range = _YCBCR_MATRICES[enums.YCBCR_BT601_TV]
+
+    r = (color >> 24) / 255
+    g = ((color >> 16) & 0xFF) / 255
+    b = ((color >> 8) & 0xFF) / 255
+    y = kr * r + (1 - kr - kb) * g + kb * b
+    pb = (b - y) / (2 * (1 - kb))
+    pr = (r - y) / (2 * (1 - kr))
+    if full_range:
+        return (
+            255 * y,
+            min(max(128 + 255 * pb, 0), 255),
+            min(max(128 + 255 * pr, 0), 255),
+        )
+    return 16 + 219 * y, 128 + 224 * pb, 128 + 224 * pr
+
+
+def _blend_plane(plane, rows, cols, alpha, value, shift):
+    dst = plane[rows, cols]
+    if shift:
+        dst = dst >> shift
+    value = numpy.float32(value)
+    result = (dst + alpha * (value - dst) + 0.5).astype(plane.dtype)
+    plane[rows, cols] = result << shift if shift else result
+
+
+def _subsample(alpha, y0, x0):
+    """Average a coverage array over 2x2 chroma blocks.
+
+    :param alpha: coverage array placed at (y0, x0) in luma coordinates
+    :param y0: luma row of the first coverage row
+    :param x0: luma column of the first coverage column
+    :return: chroma coverage array and its chroma row and column slices
+    """
+    cy0 = y0 // 2
+    cx0 = x0 // 2
+    cy1 = (y0 + alpha.shape[0] + 1) // 2
+    cx1 = (x0 + alpha.shape[1] + 1) // 2
+    padded = numpy.zeros((2 * (cy1 - cy0), 2 * (cx1 - cx0)), numpy.float32)
+    padded[
+        y0 - 2 * cy0 : y0 - 2 * cy0 + alpha.shape[0],
+        x0 - 2 * cx0 : x0 - 2 * cx0 + alpha.shape[1],
+    ] = alpha
+    chroma = padded.reshape(cy1 - cy0, 2, cx1 - cx0, 2).mean(axis=(1, 3))
+    return chroma, slice(cy0, cy1), slice(cx0, cx1)
+
+
+def blend_yuv(
+    image,
+    planes,
+    pixel_format="I420",
+    matrix=enums.YCBCR_DEFAULT,
+    video_matrix=enums.YCBCR_BT601_TV,
+):
+    """Blend a list of ASS_Image onto a planar YUV 4:2:0 frame, in place.
+
+    Each image color is converted once with the YCbCrMatrix of the track,
+    so there is no need to convert the whole frame to RGB and back.
+
+    :param image: first ASS_Image of the list, an image_array() snapshot
+                  or None
+    :param planes: for "I420" a tuple of Y, U and V 2-D arrays, for "NV12"
+                   and "P010" a tuple of the Y 2-D array and the interleaved
+                   UV array, of shape (height / 2, width) or
+                   (height / 2, width / 2, 2)
+    :param pixel_format: one of "I420", "NV12" or "P010"
+    :param matrix: YCbCrMatrix of the track
+    :param video_matrix: matrix of the video, used when the track asks for
+                         no color mangling (YCBCR_NONE)
+    :return: number of blended images
+    """
+    try:
+        n_planes, dtype, shift = _YUV_FORMATS[pixel_format]
+    except KeyError:
+        raise LibassError("Unknown pixel format {!r}".format(pixel_format))
+
+    if len(planes) != n_planes or any(
+        plane.dtype != dtype for plane in planes
+    ):
+        raise LibassError(
+            "{} needs {} planes of {}".format(
+                pixel_format, n_planes, numpy.dtype(dtype).name
+            )
+        )
+
+    luma = planes[0]
+    if n_planes == 3:
+        chroma_u, chroma_v = planes[1], planes[2]
+    else:
+        uv = planes[1]
+        if uv.ndim == 2:
+            uv = uv.reshape(uv.shape[0], -1, 2)
+        chroma_u, chroma_v = uv[..., 0], uv[..., 1]
+
+    scale = 1 << (8 * numpy.dtype(dtype).itemsize - shift - 8)
+    count = 0
+    for item in _iter_images(image):
+        opacity = 255 - (item.color & 0xFF)
+        clipped = (
+            _clip(item, luma.shape[0], luma.shape[1]) if opacity else None
+        )
+        if clipped is not None:
+            src, rows, cols = clipped
+            alpha = src * numpy.float32(opacity / _MAX_COVERAGE)
+            y, u, v = (
+                c * scale
+                for c in color_to_yuv(item.color, matrix, video_matrix)
+            )
+            _blend_plane(luma, rows, cols, alpha, y, shift)
+            alpha, rows, cols = _subsample(alpha, rows.start, cols.start)
+            _blend_plane(chroma_u, rows, cols, alpha, u, shift)
+            _blend_plane(chroma_v, rows, cols, alpha, v, shift)
+        count += 1
+    return count
@@ -0,0 +1,230 @@
+#   © 2019 Luni-4 <luni-4@hotmail.it>
+#   https://github.com/bubblesub/pyass
+#
+#   This program is free software: you can redistribute it and/or modify it
+#   under the terms of the GNU Lesser General Public License as published
+#   by the Free Software Foundation, either version 3 of the License,
+#   or (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty
+#   of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#   See the GNU Lesser General Public License for more details.
+#
+#   You should have received a copy of the GNU Lesser General Public License
+#   along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Process-wide registry of memory fonts.
+"""
+
+import hashlib
+import mmap
+import os
+import threading
+import weakref
+from concurrent.futures import Future
+
+from .utils import LibassError
+
+__all__ = ["FontRegistry", "get_font_registry", "forget_library", "warmup"]
+
+# Every FontRegistry, to be told when the fonts of a library are cleared
+_registries = weakref.WeakSet()
+
+
+class FontRegistry:
+    """Store of font data shared by any number of ASS_Library objects.
+
+    Fonts are deduplicated by the SHA-256 of their content, so the same font
+    added under several names or from several places is kept once. Font
+    files are memory-mapped instead of being read into Python objects.
+    libass still makes its own copy of the data in every library the font
+    is registered with.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # digest -> font data
+        self._fonts = {}
+        # attachment name -> digest
+        self._names = {}
+        # (path, size, mtime) -> digest, to avoid hashing files again
+        self._files = {}
+        # ASS_Library -> set of digests of the registered fonts
+        self._registered = weakref.WeakKeyDictionary()
+        self.hits = 0
+        self.misses = 0
+        _registries.add(self)
+
+    def _store(self, name, digest, data):
+        if digest in self._fonts:
+            self.hits += 1
+            if isinstance(data, mmap.mmap):
+                data.close()
+        else:
+            self.misses += 1
+            self._fonts[digest] = data
+        self._names[name] = digest
+        return digest
+
+    def add(self, name, data):
+        """Add font data.
+
+        :param name: attachment name
+        :param data: binary font data
+        :return: hex digest of the data
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            return self._store(name, digest, bytes(data))
+
+    def add_file(self, path, name=None):
+        """Add a font file, memory-mapped when it is not empty.
+
+        :param path: path of the font file
+        :param name: attachment name, the file name if omitted
+        :return: hex digest of the data
+        """
+        path = os.path.abspath(path)
+        if name is None:
+            name = os.path.basename(path)
+        stat = os.stat(path)
+        key = (path, stat.st_size, stat.st_mtime_ns)
+
+        with self._lock:
+            digest = self._files.get(key)
+            if digest is not None and digest in self._fonts:
+                self.hits += 1
+                self._names[name] = digest
+                return digest
+
+        with open(path, "rb") as f:
+            if stat.st_size:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                data = b""
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            self._files[key] = digest
+            return self._store(name, digest, data)
+
+    def add_dir(self, fonts_dir):
+        """Add every font file of a directory, recursively.
+
+        :param fonts_dir: fonts directory
+        :return: list of hex digests of the added fonts
+        """
+        digests = []
+        for root, _, files in os.walk(fonts_dir):
+            for file_name in sorted(files):
+                if file_name.lower().endswith(
+                    (".ttf", ".otf", ".ttc", ".otc", ".pfb", ".pfa")
+                ):
+                    path = os.path.join(root, file_name)
+                    digests.append(self.add_file(path))
+        return digests
+
+    def register(self, ass_library, names=None):
+        """Add fonts of the registry to a library, once per font content.
+
+        Names sharing the same data are registered once, under the first of
+        them. A font is marked as registered only once ass_add_font() has
+        returned, so a failed call is retried by the next register().
+
+        :param ass_library: ASS_Library handle
+        :param names: attachment names to register, all if omitted
+        """
+        with self._lock:
+            if names is None:
+                names = list(self._names)
+            for name in names:
+                if name not in self._names:
+                    raise LibassError("Unknown font {!r}".format(name))
+            registered = self._registered.setdefault(ass_library, set())
+            for name in names:
+                digest = self._names[name]
+                if digest not in registered:
+                    ass_library.ass_add_font(name, self._fonts[digest])
+                    registered.add(digest)
+
+    def forget(self, ass_library):
+        """Forget which fonts were registered with a library, so that the
+           next register() adds them again. Called when the fonts of the
+           library are cleared.
+
+        :param ass_library: ASS_Library handle
+        """
+        with self._lock:
+            self._registered.pop(ass_library, None)
+
+    @property
+    def hit_rate(self):
+        """Fraction of added fonts that were already in the registry.
+        """
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        """Return the registry statistics.
+
+        :return: dict with the number of stored fonts, names, their total
+                 size in bytes, hits, misses and hit rate
+        """
+        with self._lock:
+            return {
+                "fonts": len(self._fonts),
+                "names": len(self._names),
+                "bytes": sum(len(data) for data in self._fonts.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hit_rate,
+            }
+
+
+_registry = FontRegistry()
+
+
+def get_font_registry():
+    """Return the process-wide FontRegistry.
+    """
+    return _registry
+
+
+def forget_library(ass_library):
+    """Make every FontRegistry forget the fonts registered with a library.
+
+    :param ass_library: ASS_Library handle
+    """
+    for registry in list(_registries):
+        registry.forget(ass_library)
+
+
+def warmup(ass_library, config):
+    """Create a renderer and initialize its font provider on a background
+       thread, so that the caller can go on while fonts are scanned.
+
+    This only moves the startup cost off the calling thread: libass 0.13 and
+    later ignore the update argument of ass_set_fonts(), and the font scan
+    is only persisted by the font provider itself, e.g. in the fontconfig
+    cache.
+
+    The thread uses ass_library while the caller may still use it; do not
+    change the library (ass_add_font(), ass_set_fonts_dir()...) until the
+    future is done.
+
+    :param ass_library: ASS_Library handle
+    :param config: RendererConfig of the renderer
+    :return: Future holding the warmed up ASS_Renderer
+    """
+    future = Future()
+
+    def run():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(config.create(ass_library))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, name="pyass-font-warmup", daemon=True).start()
+    return future
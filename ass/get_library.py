@@ -17,7 +17,6 @@
 
 import ctypes
 import os
-from ctypes.util import find_library
 
 __all__ = ["get_library"]
 
@@ -34,10 +33,15 @@ def get_library(
     win64_format=None,
     win_class_name="CDLL",
     win_attr_format=None,
+    library_path=None,
 ):
     """Find and load a shared library.
+
+    If library_path is given, the library is loaded from there without
+    searching for it.
     """
-    library_path = get_library_path(name, win_format, win64_format)
+    if library_path is None:
+        library_path = get_library_path(name, win_format, win64_format)
     if not library_path:
         if not lib_name:
             lib_name = name
@@ -77,6 +81,8 @@ if os.name == "nt":
             return win_format
 
     def get_library_path(name, win_format, win64_format):
+        from ctypes.util import find_library
+
         win_formats = get_win_format(win_format, win64_format)
         if isinstance(win_formats, str):
             win_formats = [win_formats]
@@ -146,6 +152,8 @@ if os.name == "nt":
 else:
 
     def get_library_path(name, win_format, win64_format):
+        from ctypes.util import find_library
+
         return find_library(name)
 
     def load_library(
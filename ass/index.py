@@ -0,0 +1,157 @@
+#   © 2019 Luni-4 <luni-4@hotmail.it>
+#   https://github.com/bubblesub/pyass
+#
+#   This program is free software: you can redistribute it and/or modify it
+#   under the terms of the GNU Lesser General Public License as published
+#   by the Free Software Foundation, either version 3 of the License,
+#   or (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty
+#   of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#   See the GNU Lesser General Public License for more details.
+#
+#   You should have received a copy of the GNU Lesser General Public License
+#   along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Time index over the events of a track.
+"""
+
+import re
+from collections import namedtuple
+
+import numpy
+
+__all__ = ["ChangePoints", "EventIndex", "is_dynamic"]
+
+# Override tags that make the rendering of an event change over time
+_DYNAMIC_TAGS = re.compile(
+    rb"\\(?:t\s*\(|move\s*\(|fade?\s*\(|[kK][fo]?\s*\d)"
+)
+
+ChangePoints = namedtuple("ChangePoints", ("times", "dynamic"))
+
+
+def is_dynamic(text):
+    """Whether the text of an event contains time-dependent override tags
+       (\\t, \\move, \\fad, \\fade or karaoke tags).
+
+    :param text: event text as bytes
+    :return: True if the event must be rendered on every frame
+    """
+    return _DYNAMIC_TAGS.search(text) is not None
+
+
+class EventIndex:
+    """Sorted-endpoint index answering which events are visible when.
+
+    An event is visible at time t when Start <= t < Start + Duration, as in
+    libass. Queries are binary searches followed by a vectorized filter of
+    the candidate events.
+    """
+
+    def __init__(self, starts, durations, dynamic=None):
+        """Build the index.
+
+        :param starts: event start times in milliseconds
+        :param durations: event durations in milliseconds
+        :param dynamic: per-event flags telling which events change over
+                        time, see is_dynamic()
+        """
+        starts = numpy.asarray(starts, dtype=numpy.int64)
+        ends = starts + numpy.maximum(
+            numpy.asarray(durations, dtype=numpy.int64), 0
+        )
+
+        self._order = numpy.argsort(starts, kind="stable")
+        self._ranks = numpy.argsort(self._order)
+        self._starts = starts[self._order]
+        self._ends = ends[self._order]
+        # Running maximum of the end times in start order: every event before
+        # the first running maximum above t has already ended at t
+        self._max_ends = numpy.maximum.accumulate(self._ends)
+        self._sorted_ends = numpy.sort(ends)
+        self._dynamic = (
+            numpy.zeros(len(starts), dtype=bool)
+            if dynamic is None
+            else numpy.asarray(dynamic, dtype=bool)
+        )
+
+    def __len__(self):
+        return len(self._starts)
+
+    def _active(self, hi, t):
+        lo = numpy.searchsorted(self._max_ends, t, side="right")
+        candidates = slice(min(lo, hi), hi)
+        visible = self._ends[candidates] > t
+        return numpy.sort(self._order[candidates][visible])
+
+    def count_at(self, t):
+        """Count the events visible at a time.
+
+        :param t: time in milliseconds
+        :return: number of visible events
+        """
+        return int(
+            numpy.searchsorted(self._starts, t, side="right")
+            - numpy.searchsorted(self._sorted_ends, t, side="right")
+        )
+
+    def active_at(self, t):
+        """Return the events visible at a time.
+
+        :param t: time in milliseconds
+        :return: sorted numpy array of event ids
+        """
+        hi = numpy.searchsorted(self._starts, t, side="right")
+        return self._active(hi, t)
+
+    def active_in(self, t0, t1):
+        """Return the events visible at some point of a time range.
+
+        :param t0: start of the range in milliseconds
+        :param t1: end of the range in milliseconds, excluded
+        :return: sorted numpy array of event ids
+        """
+        hi = numpy.searchsorted(self._starts, t1, side="left")
+        return self._active(hi, t0)
+
+    def is_empty(self, t):
+        """Whether no event is visible at a time.
+
+        :param t: time in milliseconds
+        :return: True if no event is visible
+        """
+        return self.count_at(t) == 0
+
+    def change_points(self, t0, t1):
+        """Find when the set of visible events changes in a time range.
+
+        Between two consecutive change points the same events are visible,
+        so a frame rendered at the first one can be reused until the next,
+        except in the dynamic ranges where some visible event changes on
+        every frame.
+
+        :param t0: start of the range in milliseconds
+        :param t1: end of the range in milliseconds, excluded
+        :return: ChangePoints holding the sorted change times, t0 included,
+                 and the merged list of (start, end) dynamic ranges
+        """
+        endpoints = numpy.concatenate((self._starts, self._ends))
+        endpoints = endpoints[(endpoints > t0) & (endpoints < t1)]
+        times = numpy.unique(
+            numpy.concatenate((numpy.array([t0], numpy.int64), endpoints))
+        )
+
+        ids = self.active_in(t0, t1)
+        ids = ids[self._dynamic[ids]]
+        ranks = self._ranks[ids]
+        starts = numpy.maximum(self._starts[ranks], t0)
+        ends = numpy.minimum(self._ends[ranks], t1)
+        dynamic = []
+        for start, end in sorted(zip(starts.tolist(), ends.tolist())):
+            if dynamic and start <= dynamic[-1][1]:
+                dynamic[-1] = (dynamic[-1][0], max(dynamic[-1][1], end))
+            else:
+                dynamic.append((start, end))
+        return ChangePoints(times, dynamic)
@@ -0,0 +1,203 @@
+#   © 2019 Luni-4 <luni-4@hotmail.it>
+#   https://github.com/bubblesub/pyass
+#
+#   This program is free software: you can redistribute it and/or modify it
+#   under the terms of the GNU Lesser General Public License as published
+#   by the Free Software Foundation, either version 3 of the License,
+#   or (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty
+#   of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#   See the GNU Lesser General Public License for more details.
+#
+#   You should have received a copy of the GNU Lesser General Public License
+#   along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Count and time the calls into libass.
+
+Instrumentation replaces the functions of ass.libass with wrappers and
+disable() puts the original functions back, so nothing is paid while it is
+off. Counters are updated without locking and may miss a few calls made
+concurrently from several threads.
+"""
+
+import threading
+import time
+
+from . import libass
+
+__all__ = ["enable", "disable", "is_enabled", "reset", "snapshot", "profile"]
+
+# Number of histogram buckets: bucket i counts the calls that took less than
+# 2 ** i nanoseconds, the last one everything longer
+HISTOGRAM_BUCKETS = 40
+
+_lock = threading.Lock()
+_originals = {}
+_stats = {}
+
+
+class _Stats:
+    __slots__ = ("calls", "timed", "total_ns", "max_ns", "histogram")
+
+    def __init__(self):
+        self.calls = 0
+        self.timed = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.histogram = [0] * HISTOGRAM_BUCKETS
+
+    def add(self, elapsed):
+        self.timed += 1
+        self.total_ns += elapsed
+        if elapsed > self.max_ns:
+            self.max_ns = elapsed
+        self.histogram[
+            min(elapsed.bit_length(), HISTOGRAM_BUCKETS - 1)
+        ] += 1
+
+    def as_dict(self):
+        return {
+            "calls": self.calls,
+            "timed": self.timed,
+            "total_ns": self.total_ns,
+            "mean_ns": self.total_ns / self.timed if self.timed else 0.0,
+            "max_ns": self.max_ns,
+            "histogram": {
+                1 << i: count
+                for i, count in enumerate(self.histogram)
+                if count
+            },
+        }
+
+
+def _wrap(func, stats, sample_every):
+    clock = time.perf_counter_ns
+
+    if sample_every == 1:
+
+        def wrapper(*args):
+            stats.calls += 1
+            start = clock()
+            try:
+                return func(*args)
+            finally:
+                stats.add(clock() - start)
+
+    else:
+
+        def wrapper(*args):
+            stats.calls += 1
+            if stats.calls % sample_every:
+                return func(*args)
+            start = clock()
+            try:
+                return func(*args)
+            finally:
+                stats.add(clock() - start)
+
+    wrapper.__name__ = func.__name__
+    wrapper.__wrapped__ = func
+    return wrapper
+
+
+def enable(names=None, sample_every=1):
+    """Wrap libass functions with counters and timers.
+
+    Functions already instrumented are left as they are.
+
+    :param names: names of the functions to instrument, all of them if
+                  omitted
+    :param sample_every: time one call out of this many, every call is
+                         counted
+    """
+    if sample_every < 1:
+        raise ValueError("sample_every must be at least 1")
+    with _lock:
+        for name in libass._prototypes if names is None else names:
+            if name in _originals:
+                continue
+            try:
+                func = libass.bind(name)
+            except AttributeError:
+                # Missing from older libass versions
+                if names is not None:
+                    raise
+                continue
+            stats = _stats.setdefault(name, _Stats())
+            _originals[name] = func
+            setattr(libass, name, _wrap(func, stats, sample_every))
+
+
+def disable():
+    """Put the original libass functions back. The collected statistics are
+       kept until reset() is called.
+    """
+    with _lock:
+        for name, func in _originals.items():
+            setattr(libass, name, func)
+        _originals.clear()
+
+
+def is_enabled():
+    """Whether some libass functions are instrumented.
+
+    :return: True if enabled
+    """
+    return bool(_originals)
+
+
+def reset():
+    """Clear the collected statistics.
+    """
+    with _lock:
+        for stats in _stats.values():
+            stats.__init__()
+
+
+def snapshot():
+    """Return the collected statistics.
+
+    :return: dict mapping the name of every function called since the last
+             reset to a dict of calls, timed (number of timed calls),
+             total_ns, mean_ns, max_ns and histogram (upper bound in
+             nanoseconds to number of timed calls)
+    """
+    return {
+        name: stats.as_dict()
+        for name, stats in _stats.items()
+        if stats.calls
+    }
+
+
+class profile:
+    """Context manager collecting statistics on a block of code.
+
+    Statistics are reset when entering the block and stored in the stats
+    attribute when leaving it. Instrumentation enabled by the context manager
+    is disabled when leaving it.
+    """
+
+    def __init__(self, names=None, sample_every=1):
+        """Prepare the profiling.
+
+        :param names: names of the functions to instrument, all of them if
+                      omitted
+        :param sample_every: time one call out of this many
+        """
+        self.names = names
+        self.sample_every = sample_every
+        self.stats = None
+        self._enabled = False
+
+    def __enter__(self):
+        self._enabled = not is_enabled()
+        reset()
+        enable(self.names, self.sample_every)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stats = snapshot()
+        if self._enabled:
+            disable()
@@ -6,12 +6,148 @@ import os
 
 from .get_library import get_library
 
-lib = get_library(
-    "ass",
-    win_format="lib{}.dll",
-    win64_format=["lib{}.dll"],
-    win_class_name="WinDLL",
-)
+# Path of the shared library, searched with find_library when not set
+library_path = os.environ.get("PYASS_LIBRARY") or None
+
+_lib = None
+
+# Prototypes of the library functions, by name
+_prototypes = {}
+
+
+def _select_backend():
+    """Use the compiled cffi module when it is available, unless the
+       PYASS_BACKEND environment variable asks for ctypes.
+    """
+    from importlib.util import find_spec
+
+    backend = os.environ.get("PYASS_BACKEND")
+    if backend in ("ctypes", "cffi"):
+        return backend
+    try:
+        return "cffi" if find_spec("ass._libass_cffi") else "ctypes"
+    except ImportError:
+        return "ctypes"
+
+
+# Backend implementing the functions: "cffi" or "ctypes"
+BACKEND = _select_backend()
+
+# Whether PYASS_BACKEND asked for BACKEND, in which case there is no fallback
+_BACKEND_REQUESTED = os.environ.get("PYASS_BACKEND") == BACKEND
+
+
+def set_library_path(path):
+    """Load the shared library from a path, without searching for it. Must
+       be called before the first libass call.
+
+    :param path: path of the shared library
+    """
+    global library_path
+    if _lib is not None:
+        raise OSError("libass is already loaded")
+    library_path = path
+
+
+def load_library():
+    """Load the shared library, on the first call only, and bind all its
+       functions.
+
+    :return: the loaded library
+    """
+    global _lib
+    if _lib is None:
+        _lib = get_library(
+            "ass",
+            win_format="lib{}.dll",
+            win64_format=["lib{}.dll"],
+            win_class_name="WinDLL",
+            library_path=library_path,
+        )
+        # Bind everything now: a function first called from a destructor
+        # at interpreter exit could not be bound anymore
+        for name, prototype in _prototypes.items():
+            if globals().get(name) is prototype:
+                try:
+                    globals()[name] = get_function(name)
+                except AttributeError:
+                    # Missing from older libass versions
+                    pass
+    return _lib
+
+
+def get_function(name, backend=None):
+    """Get a function of the shared library from a backend, loading the
+       library if needed. Functions the cffi backend does not implement come
+       from ctypes.
+
+    :param name: function name
+    :param backend: "cffi" or "ctypes", BACKEND if omitted
+    :return: the function
+    """
+    global BACKEND
+
+    # Loaded first, so that the cffi module links to the same library
+    library = load_library()
+
+    if (backend or BACKEND) == "cffi":
+        try:
+            from ._cffi_calls import FUNCTIONS
+        except ImportError:
+            if backend == "cffi" or _BACKEND_REQUESTED:
+                raise
+            # Found but not loadable, e.g. built against another libass:
+            # record that every function comes from ctypes
+            BACKEND = "ctypes"
+            FUNCTIONS = {}
+
+        if name in FUNCTIONS:
+            return FUNCTIONS[name]
+
+    prototype = _prototypes[name]
+    func = getattr(library, name)
+    func.restype = prototype.restype
+    func.argtypes = prototype.argtypes
+    return func
+
+
+def bind(name):
+    """Bind a function of the shared library, loading it if needed.
+
+    :param name: function name
+    :return: the function
+    """
+    func = globals()[name]
+    if isinstance(func, _LazyFunction):
+        func = get_function(name)
+        globals()[name] = func
+    return func
+
+
+class _LazyFunction:
+    """Prototype of a library function, bound on the first call.
+    """
+
+    def __init__(self, name):
+        self.__name__ = name
+        self.restype = ctypes.c_int
+        self.argtypes = None
+        _prototypes[name] = self
+
+    def __call__(self, *args):
+        return bind(self.__name__)(*args)
+
+
+class _LazyLibrary:
+    """Library whose functions are looked up on their first call, so that
+       importing this module does not load the shared library.
+    """
+
+    def __getattr__(self, name):
+        return _LazyFunction(name)
+
+
+lib = _LazyLibrary()
 
 LIBASS_VERSION = 0x01400000
 FUNCTYPE = ctypes.WINFUNCTYPE if os.name == "nt" else ctypes.CFUNCTYPE
@@ -153,12 +289,9 @@ ASS_Image._fields_ = [
 
 """ API """
 
+# The va_list argument is passed as a pointer on all supported ABIs
 Callback = FUNCTYPE(
-    ctypes.c_void_p,
-    ctypes.c_int32,
-    ctypes.c_char_p,
-    ctypes.c_int32,
-    ctypes.c_void_p,
+    None, ctypes.c_int32, ctypes.c_char_p, ctypes.c_void_p, ctypes.c_void_p,
 )
 
 # Return the version of library. This returns the value LIBASS_VERSION was set
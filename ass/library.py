@@ -15,10 +15,18 @@
 #   along with this program. If not, see <http://www.gnu.org/licenses/>.
 
 import ctypes
+import mmap
+import os
 
 from . import enums, libass
 from .track import ASS_Track
-from .utils import LibassError, encode_str, get_encoded_path
+from .utils import (
+    LibassError,
+    encode_str,
+    get_buffer_pointer,
+    get_encoded_path,
+    run_in_executor,
+)
 
 
 class ASS_Library:
@@ -32,6 +40,7 @@ class ASS_Library:
         if not self.library:
             raise LibassError("Cannot initialize the library")
         self._msg_cb = None
+        self.fonts_ready = None
 
     def ass_set_message_callback(self, msg_cb, data=None):
         """Register a callback for debug/info messages.
@@ -48,6 +57,20 @@ class ASS_Library:
             self.library, self._msg_cb, ctypes.cast(data, ctypes.c_void_p)
         )
 
+    def collect_messages(self, level=5, capacity=1024):
+        """Buffer the messages of the library instead of printing them,
+           replacing the message callback.
+
+        :param level: highest level kept, from 0 (fatal) to 7 (debug)
+        :param capacity: maximum number of buffered messages
+        :return: MessageCollector to drain the messages from
+        """
+        from .messages import MessageCollector
+
+        collector = MessageCollector(level, capacity)
+        self.ass_set_message_callback(collector.callback)
+        return collector
+
     def ass_set_fonts_dir(self, fonts_dir):
         """Set additional fonts directory.
 
@@ -76,19 +99,37 @@ class ASS_Library:
         """Add a memory font.
 
         :param name: attachment name
-        :param data: binary font data
+        :param data: binary font data, as any contiguous buffer (bytes,
+                     memoryview, mmap.mmap...)
         """
-        libass.ass_add_font(
-            self.library,
-            encode_str(name),
-            ctypes.cast(data, ctypes.c_char_p),
-            len(data) * ctypes.sizeof(ctypes.c_char),
-        )
+        pointer, size, owner = get_buffer_pointer(data)
+        libass.ass_add_font(self.library, encode_str(name), pointer, size)
+        del pointer, owner
 
     def ass_clear_fonts(self):
         """Remove all fonts stored in an ass_library object.
+
+        Font registries will add their fonts again on the next register().
         """
+        from .fonts import forget_library
+
         libass.ass_clear_fonts(self.library)
+        forget_library(self)
+
+    def warmup_fonts(self, config):
+        """Create a renderer and initialize its font provider on a background
+           thread, see fonts.warmup().
+
+        The future is also stored in the fonts_ready attribute. The library
+        must not be changed until it is done.
+
+        :param config: RendererConfig of the renderer to warm up
+        :return: Future holding the warmed up ASS_Renderer
+        """
+        from .fonts import warmup
+
+        self.fonts_ready = warmup(self, config)
+        return self.fonts_ready
 
     def ass_get_available_font_providers(self):
         """Get the list of available font providers.
@@ -137,15 +178,20 @@ class ASS_Library:
     def ass_read_memory(self, buf, codepage):
         """Read subtitles from memory.
 
-        :param buf: subtitles text data
+        The data is passed to libass without copying it, libass makes its own
+        copy while parsing.
+
+        :param buf: subtitles text data, as str or any contiguous buffer
+                    (bytes, bytearray, memoryview, mmap.mmap...)
         :param codepage: encoding (iconv format)
         :return: a new ASS_Track object
         """
+        pointer, size, owner = get_buffer_pointer(buf)
         track = libass.ass_read_memory(
-            self.library,
-            ctypes.cast((ctypes.c_char * len(buf))(*buf), ctypes.c_char_p),
-            encode_str(codepage),
+            self.library, pointer, size, encode_str(codepage),
         )
+        # Release the buffer export, so that mmap objects can be closed
+        del pointer, owner
 
         if not track:
             raise LibassError("Cannot allocate a new empty track object")
@@ -155,6 +201,37 @@ class ASS_Library:
         track_obj.track = track
         return track_obj
 
+    def ass_read_mmap(self, fname, codepage):
+        """Read subtitles from a memory-mapped file.
+
+        :param fname: file name
+        :param codepage: encoding (iconv format)
+        :return: a new ASS_Track object
+        """
+        with open(fname, "rb") as f:
+            if not os.fstat(f.fileno()).st_size:
+                return self.ass_read_memory(b"", codepage)
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                return self.ass_read_memory(buf, codepage)
+
+    async def read_file_async(self, fname, codepage):
+        """Read subtitles from file without blocking the event loop.
+
+        :param fname: file name
+        :param codepage: encoding (iconv format)
+        :return: a new ASS_Track object
+        """
+        return await run_in_executor(self.ass_read_file, fname, codepage)
+
+    async def read_memory_async(self, buf, codepage):
+        """Read subtitles from memory without blocking the event loop.
+
+        :param buf: subtitles text data
+        :param codepage: encoding (iconv format)
+        :return: a new ASS_Track object
+        """
+        return await run_in_executor(self.ass_read_memory, buf, codepage)
+
     def __del__(self):
         """Finalize the library.
         """
@@ -0,0 +1,127 @@
+#   © 2019 Luni-4 <luni-4@hotmail.it>
+#   https://github.com/bubblesub/pyass
+#
+#   This program is free software: you can redistribute it and/or modify it
+#   under the terms of the GNU Lesser General Public License as published
+#   by the Free Software Foundation, either version 3 of the License,
+#   or (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty
+#   of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#   See the GNU Lesser General Public License for more details.
+#
+#   You should have received a copy of the GNU Lesser General Public License
+#   along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Buffered collection of libass messages.
+"""
+
+import ctypes
+import os
+from collections import deque, namedtuple
+
+__all__ = ["Message", "MessageCollector"]
+
+# libass message levels go from 0 (fatal) to 7 (debug): 1 for errors, 2 for
+# warnings, 4 for information and 6 for verbose messages
+LEVELS = 8
+
+# Size of the buffer messages are formatted into, longer ones are truncated
+MESSAGE_SIZE = 1024
+
+Message = namedtuple("Message", ("level", "text"))
+
+_vsnprintf = None
+
+
+def _get_vsnprintf():
+    global _vsnprintf
+    if _vsnprintf is None:
+        if os.name == "nt":
+            func = ctypes.cdll.msvcrt._vsnprintf
+        else:
+            func = ctypes.CDLL(None).vsnprintf
+        func.restype = ctypes.c_int
+        func.argtypes = [
+            ctypes.c_char_p,
+            ctypes.c_size_t,
+            ctypes.c_char_p,
+            ctypes.c_void_p,
+        ]
+        _vsnprintf = func
+    return _vsnprintf
+
+
+class MessageCollector:
+    """Collect libass messages in a ring buffer.
+
+    Messages above the configured level only increment a counter. The others
+    are formatted by the C library while the va_list of libass is still
+    valid, and stored as bytes; they are decoded when drained. When the
+    buffer is full, the oldest messages are dropped.
+    """
+
+    def __init__(self, level=5, capacity=1024):
+        """Create the collector.
+
+        :param level: highest level kept, from 0 (fatal) to 7 (debug)
+        :param capacity: maximum number of buffered messages
+        """
+        self.level = level
+        self.counts = [0] * LEVELS
+        self.dropped = 0
+        self._messages = deque(maxlen=capacity)
+        self._vsnprintf = _get_vsnprintf()
+
+    def __len__(self):
+        return len(self._messages)
+
+    def callback(self, level, fmt, args, data):
+        """Message callback to register with ass_set_message_callback.
+        """
+        self.counts[min(max(level, 0), LEVELS - 1)] += 1
+        if level > self.level:
+            return
+        buf = ctypes.create_string_buffer(MESSAGE_SIZE)
+        self._vsnprintf(buf, MESSAGE_SIZE, fmt, args)
+        if len(self._messages) == self._messages.maxlen:
+            self.dropped += 1
+        self._messages.append((level, buf.value))
+
+    def drain(self, max_messages=None):
+        """Remove messages from the buffer, oldest first.
+
+        :param max_messages: maximum number of messages to remove, all of
+                             them if omitted
+        :return: list of Message, with the text decoded as UTF-8
+        """
+        messages = []
+        pop = self._messages.popleft
+        count = len(self._messages)
+        if max_messages is not None:
+            count = min(count, max_messages)
+        for _ in range(count):
+            level, text = pop()
+            messages.append(
+                Message(level, text.decode(errors="replace").rstrip("\n"))
+            )
+        return messages
+
+    def stats(self):
+        """Return the message counters.
+
+        :return: dict mapping levels to the number of messages emitted by
+                 libass, kept or not, plus "dropped" for the messages pushed
+                 out of the full buffer
+        """
+        stats = dict(enumerate(self.counts))
+        stats["dropped"] = self.dropped
+        return stats
+
+    def reset(self):
+        """Clear the buffer and the counters.
+        """
+        self._messages.clear()
+        self.counts = [0] * LEVELS
+        self.dropped = 0
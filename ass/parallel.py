@@ -0,0 +1,135 @@
+#   © 2019 Luni-4 <luni-4@hotmail.it>
+#   https://github.com/bubblesub/pyass
+#
+#   This program is free software: you can redistribute it and/or modify it
+#   under the terms of the GNU Lesser General Public License as published
+#   by the Free Software Foundation, either version 3 of the License,
+#   or (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty
+#   of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#   See the GNU Lesser General Public License for more details.
+#
+#   You should have received a copy of the GNU Lesser General Public License
+#   along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Render a track timeline on several processes.
+"""
+
+import collections
+import functools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from .compose import to_rgba
+from .library import ASS_Library
+from .utils import LibassError
+
+__all__ = ["RenderFarm"]
+
+# Per-process state of the workers: library, renderer, track and compose
+_worker = None
+
+
+def _init_worker(filename, data, codepage, fonts_dir, config, compose):
+    global _worker
+
+    library = ASS_Library()
+    if fonts_dir is not None:
+        library.ass_set_fonts_dir(fonts_dir)
+    renderer = config.create(library)
+    if filename is not None:
+        track = library.ass_read_file(filename, codepage)
+    else:
+        track = library.ass_read_memory(data, codepage)
+    if compose is None:
+        width, height = config.frame_size
+        compose = functools.partial(to_rgba, width=width, height=height)
+    _worker = (library, renderer, track, compose)
+
+
+def _render_chunk(timestamps):
+    _, renderer, track, compose = _worker
+    return list(renderer.render_many(track, timestamps, compose))
+
+
+class RenderFarm:
+    """Render a track on a pool of processes.
+
+    Every worker process owns its library, fonts, renderer and track.
+    Timestamps are split into contiguous chunks, so each worker renders
+    neighbouring frames and keeps its glyph and bitmap caches warm.
+    """
+
+    def __init__(
+        self,
+        config,
+        filename=None,
+        data=None,
+        codepage=None,
+        fonts_dir=None,
+        compose=None,
+        processes=None,
+        chunks_per_process=4,
+    ):
+        """Start the worker processes.
+
+        :param config: RendererConfig used by every worker
+        :param filename: subtitles file name
+        :param data: subtitles text data, used when filename is None
+        :param codepage: encoding (iconv format)
+        :param fonts_dir: additional fonts directory
+        :param compose: picklable function called in the workers with the
+                        first ASS_Image of each frame (None if the frame has
+                        no subtitles); its picklable return value is sent
+                        back. Defaults to an RGBA frame of the frame size
+        :param processes: number of worker processes, defaults to the number
+                          of CPUs
+        :param chunks_per_process: number of chunks each worker gets per call
+                                   to map, on average
+        """
+        if (filename is None) == (data is None):
+            raise LibassError("Pass either a file name or subtitles data")
+
+        self.processes = processes or os.cpu_count() or 1
+        self.chunks_per_process = chunks_per_process
+        self._executor = ProcessPoolExecutor(
+            self.processes,
+            initializer=_init_worker,
+            initargs=(filename, data, codepage, fonts_dir, config, compose),
+        )
+
+    def map(self, timestamps):
+        """Render frames, yielding the results in timestamp order.
+
+        :param timestamps: iterable of video timestamps in milliseconds
+        :return: generator of compose results
+        """
+        timestamps = list(timestamps)
+        n_chunks = max(1, self.processes * self.chunks_per_process)
+        chunk_size = max(1, -(-len(timestamps) // n_chunks))
+
+        pending = collections.deque()
+        for start in range(0, len(timestamps), chunk_size):
+            pending.append(
+                self._executor.submit(
+                    _render_chunk, timestamps[start : start + chunk_size]
+                )
+            )
+            # Keep a bounded number of chunks in flight
+            while len(pending) > 2 * self.processes:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+    def close(self):
+        """Stop the worker processes.
+        """
+        self._executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
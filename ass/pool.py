@@ -0,0 +1,197 @@
+#   © 2019 Luni-4 <luni-4@hotmail.it>
+#   https://github.com/bubblesub/pyass
+#
+#   This program is free software: you can redistribute it and/or modify it
+#   under the terms of the GNU Lesser General Public License as published
+#   by the Free Software Foundation, either version 3 of the License,
+#   or (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty
+#   of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#   See the GNU Lesser General Public License for more details.
+#
+#   You should have received a copy of the GNU Lesser General Public License
+#   along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Pools of ASS_Renderer objects.
+"""
+
+import contextlib
+import functools
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from .compose import to_rgba
+
+__all__ = ["RendererPool", "KeyedRendererPool"]
+
+
+class RendererPool:
+    """Render frames on a pool of threads, one ASS_Renderer per thread.
+
+    ctypes releases the GIL while libass renders, so frames of different
+    tracks are rendered in parallel. libass writes to the events of a track
+    while rendering it, so frames of the same track are rendered one at a
+    time, under the render_lock of the track; their compose calls still run
+    in parallel. Tracks must not be modified while frames are being
+    rendered.
+    """
+
+    def __init__(self, ass_library, config, max_workers=None):
+        """Start the pool.
+
+        :param ass_library: ASS_Library handle shared by the renderers
+        :param config: RendererConfig of every renderer
+        :param max_workers: number of threads
+        """
+        self.ass_library = ass_library
+        self.config = config
+        self._local = threading.local()
+        self._executor = ThreadPoolExecutor(max_workers)
+        width, height = config.frame_size
+        self._default_compose = functools.partial(
+            to_rgba, width=width, height=height
+        )
+
+    def _get_renderer(self):
+        renderer = getattr(self._local, "renderer", None)
+        if renderer is None:
+            renderer = self.config.create(self.ass_library)
+            self._local.renderer = renderer
+        return renderer
+
+    def _render(self, track, now, compose):
+        renderer = self._get_renderer()
+        with track.render_lock:
+            image, _ = renderer._render_frame(track, now)
+        return compose(image)
+
+    def submit(self, track, now, compose=None):
+        """Schedule a frame to be rendered.
+
+        :param track: ASS_Track
+        :param now: video timestamp in milliseconds
+        :param compose: function called on the rendering thread with the
+                        first ASS_Image of the frame (None if the frame has no
+                        subtitles). Defaults to an RGBA frame of the frame size
+        :return: Future holding the compose result
+        """
+        return self._executor.submit(
+            self._render, track, now, compose or self._default_compose
+        )
+
+    def close(self):
+        """Wait for the pending frames and stop the threads.
+        """
+        self._executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class KeyedRendererPool:
+    """Keep configured renderers around for reuse, keyed by RendererConfig.
+
+    Creating a renderer and setting up its fonts costs much more than
+    rendering a frame. Renderers are checked out for a configuration and
+    returned after use; idle renderers are kept up to max_size, the ones of
+    the least recently used configurations are dropped first. The settings
+    of a checked-out renderer must not be changed.
+    """
+
+    def __init__(self, ass_library, max_size=8):
+        """Create an empty pool.
+
+        :param ass_library: ASS_Library handle shared by the renderers
+        :param max_size: maximum number of idle renderers
+        """
+        self.ass_library = ass_library
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._idle = OrderedDict()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return self._size
+
+    def checkout(self, config):
+        """Take an idle renderer with a configuration, or create one.
+
+        :param config: RendererConfig
+        :return: ASS_Renderer, to be returned with checkin()
+        """
+        with self._lock:
+            renderers = self._idle.get(config)
+            if renderers:
+                renderer = renderers.pop()
+                # Eviction expects every idle list to hold a renderer
+                if renderers:
+                    self._idle.move_to_end(config)
+                else:
+                    del self._idle[config]
+                self._size -= 1
+                self.hits += 1
+                return renderer
+            self.misses += 1
+        return config.create(self.ass_library)
+
+    def checkin(self, config, renderer):
+        """Return a renderer to the pool.
+
+        :param config: RendererConfig the renderer was checked out with
+        :param renderer: ASS_Renderer
+        """
+        with self._lock:
+            self._idle.setdefault(config, []).append(renderer)
+            self._idle.move_to_end(config)
+            self._size += 1
+            while self._size > self.max_size:
+                key, renderers = next(iter(self._idle.items()))
+                renderers.pop(0)
+                if not renderers:
+                    del self._idle[key]
+                self._size -= 1
+                self.evictions += 1
+
+    @contextlib.contextmanager
+    def renderer(self, config):
+        """Context manager checking out a renderer and returning it on exit.
+
+        :param config: RendererConfig
+        :return: ASS_Renderer
+        """
+        renderer = self.checkout(config)
+        try:
+            yield renderer
+        finally:
+            self.checkin(config, renderer)
+
+    def stats(self):
+        """Return the pool counters.
+
+        :return: dict with the number of hits, misses and evictions, the
+                 number of idle renderers and of configurations they hold
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "idle": self._size,
+                "configs": len(self._idle),
+            }
+
+    def clear(self):
+        """Drop the idle renderers.
+        """
+        with self._lock:
+            self._idle.clear()
+            self._size = 0
@@ -15,9 +15,11 @@
 #   along with this program. If not, see <http://www.gnu.org/licenses/>.
 
 import ctypes
+import time
+from collections import namedtuple
 
-from . import enums, libass
-from .utils import LibassError, encode_str, get_encoded_path
+from . import enums, libass, utils
+from .utils import LibassError, encode_str, get_encoded_path, run_in_executor
 
 
 class ASS_Renderer:
@@ -32,6 +34,11 @@ class ASS_Renderer:
         self._renderer = libass.ass_renderer_init(ass_library.library)
         if not self._renderer:
             raise LibassError("Cannot initialize the renderer")
+        self._async_lock = None
+        self._generation = 0
+        self.telemetry = None
+        self.adaptive_cache = None
+        self.cache_limits = None
 
     def ass_set_frame_size(self, w, h):
         """Set the frame size in pixels, including margins.
@@ -60,7 +67,7 @@ class ASS_Renderer:
 
         :param level: shaping level
         """
-        libass.ass_set_sharper(self._renderer, int(level))
+        libass.ass_set_shaper(self._renderer, int(level))
 
     def ass_set_margins(self, t, b, l, r):
         """Set frame margins.
@@ -164,30 +171,288 @@ class ASS_Renderer:
         :param glyph_max: maximum number of cached glyphs.
         :param bitmap_max_size: maximum bitmap cache size (in MB)
         """
-        libass.ass_set_cache_limits(
-            self._renderer, int(glyph_max), int(bitmap_max_size)
-        )
+        self.cache_limits = (int(glyph_max), int(bitmap_max_size))
+        libass.ass_set_cache_limits(self._renderer, *self.cache_limits)
+
+    def enable_telemetry(self, capacity=1024, exporter=None):
+        """Record the rendering time, the images and the detect_change value
+           of every frame rendered from now on.
+
+        :param capacity: number of frames kept
+        :param exporter: function called with batches of recorded frames,
+                         see telemetry.RenderTelemetry
+        :return: RenderTelemetry, also available as the telemetry attribute
+        """
+        from .telemetry import RenderTelemetry
+
+        self.telemetry = RenderTelemetry(capacity, exporter)
+        return self.telemetry
+
+    def disable_telemetry(self):
+        """Stop recording frames, exporting the pending ones.
+
+        :return: the RenderTelemetry that was in use, or None
+        """
+        telemetry, self.telemetry = self.telemetry, None
+        if telemetry is not None:
+            telemetry.flush()
+        return telemetry
+
+    def enable_adaptive_cache(self, **kwargs):
+        """Adjust the cache limits to the render latency and the memory
+           usage of the process, see cache.AdaptiveCacheLimits.
+
+        The limits start from the ones set with ass_set_cache_limits() or
+        RendererConfig.cache_limits, if any.
+
+        :param kwargs: AdaptiveCacheLimits arguments
+        :return: AdaptiveCacheLimits, also available as the adaptive_cache
+                 attribute, holding the current limits and their history
+        """
+        from .cache import AdaptiveCacheLimits
 
-    def ass_render_frame(self, track, now):
+        kwargs.setdefault("initial", self.cache_limits)
+        self.adaptive_cache = AdaptiveCacheLimits(**kwargs)
+        self.adaptive_cache.apply(self)
+        return self.adaptive_cache
+
+    def disable_adaptive_cache(self):
+        """Stop adjusting the cache limits, keeping the current ones.
+
+        :return: the AdaptiveCacheLimits that was in use, or None
+        """
+        adaptive_cache, self.adaptive_cache = self.adaptive_cache, None
+        return adaptive_cache
+
+    def _render_frame(self, track, now):
+        detect_change = ctypes.c_int(0)
+        telemetry = self.telemetry
+        adaptive_cache = self.adaptive_cache
+        timed = telemetry is not None or adaptive_cache is not None
+        if timed:
+            start = time.perf_counter_ns()
+        image = libass.ass_render_frame(
+            self._renderer, track.track, int(now), ctypes.byref(detect_change),
+        )
+        image = image[0] if image else None
+        if timed:
+            wall_ns = time.perf_counter_ns() - start
+            if telemetry is not None:
+                telemetry.record(now, wall_ns, image, detect_change.value)
+            if adaptive_cache is not None:
+                adaptive_cache.record(self, wall_ns)
+        if utils.DEBUG:
+            self._generation += 1
+            if image is not None:
+                image._pyass_renderer = self
+                image._pyass_generation = self._generation
+        return image, detect_change.value
+
+    def ass_render_frame(self, track, now, snapshot=False):
         """Render a frame, producing a list of ASS_Image.
 
         :param track: ASS_Track
         :param now: video timestamp in milliseconds
+        :param snapshot: return the images as a numpy structured array, see
+                         arrays.image_array()
         :return: ASS_Image object and a value that is set to 1 if positions, or
                  set to 2 if the content changed compared to the previous call
         """
-        detect_change = ctypes.c_int(0)
-        image = libass.ass_render_frame(
-            self._renderer, track.track, int(now), ctypes.byref(detect_change),
-        )
+        image, detect_change = self._render_frame(track, now)
 
-        if not image:
+        if snapshot:
+            from .arrays import image_array
+
+            return [image_array(image), detect_change]
+
+        if image is None:
             raise LibassError("Cannot render the frame")
 
-        return [image[0], detect_change.value]
+        return [image, detect_change]
+
+    def render_many(self, track, timestamps, compose=None):
+        """Render a sequence of frames.
+
+        When libass reports that a frame did not change compared to the
+        previous one, the previous composited result is yielded again
+        instead of calling compose.
+
+        :param track: ASS_Track
+        :param timestamps: iterable of video timestamps in milliseconds
+        :param compose: function called with the first ASS_Image of each
+                        frame (None if the frame has no subtitles); its return
+                        value is yielded. If omitted, the ASS_Image itself is
+                        yielded, valid until the next frame is rendered
+        :return: generator of compose results or ASS_Image objects
+        """
+        result = None
+        first = True
+        for now in timestamps:
+            image, detect_change = self._render_frame(track, now)
+            if compose is None:
+                yield image
+            else:
+                if detect_change or first:
+                    result = compose(image)
+                    first = False
+                yield result
+
+    def _get_async_lock(self):
+        if self._async_lock is None:
+            import asyncio
+
+            self._async_lock = asyncio.Lock()
+        return self._async_lock
+
+    def _render_compose(self, track, now, compose):
+        with track.render_lock:
+            image, _ = self._render_frame(track, now)
+        return compose(image)
+
+    async def set_fonts_async(
+        self, default_font, default_family, dfp, config, update
+    ):
+        """Set font lookup defaults without blocking the event loop.
+
+        See ass_set_fonts().
+        """
+        async with self._get_async_lock():
+            await run_in_executor(
+                self.ass_set_fonts,
+                default_font,
+                default_family,
+                dfp,
+                config,
+                update,
+            )
+
+    async def render_frame_async(self, track, now, compose):
+        """Render a frame without blocking the event loop.
+
+        Calls on the same renderer are serialized. Different renderers render
+        concurrently, except for frames of the same track: libass writes to
+        the events while rendering them, so those are rendered one at a time
+        under the render_lock of the track. The images are only valid until
+        the renderer renders again, which may happen as soon as the call
+        returns, so they must be consumed by compose.
+
+        :param track: ASS_Track
+        :param now: video timestamp in milliseconds
+        :param compose: function called on the executor thread with the first
+                        ASS_Image of the frame (None if the frame has no
+                        subtitles), for example compose.to_rgba bound to the
+                        frame size; its return value must not reference the
+                        images or their bitmaps
+        :return: the compose result
+        """
+        async with self._get_async_lock():
+            return await run_in_executor(
+                self._render_compose, track, now, compose
+            )
 
     def __del__(self):
         """Finalize the renderer.
         """
         if self._renderer:
             libass.ass_renderer_done(self._renderer)
+
+
+class RendererConfig(
+    namedtuple(
+        "RendererConfig",
+        (
+            "frame_size",
+            "storage_size",
+            "margins",
+            "use_margins",
+            "pixel_aspect",
+            "font_scale",
+            "hinting",
+            "line_spacing",
+            "line_position",
+            "fonts",
+            "shaper",
+            "cache_limits",
+        ),
+    )
+):
+    """Hashable set of ASS_Renderer settings.
+
+    Every field left to None keeps the libass default. Tuple fields hold the
+    arguments of the matching ASS_Renderer setter: frame_size and
+    storage_size are (w, h), margins is (t, b, l, r), fonts is
+    (default_font, default_family, dfp, config, update) and cache_limits is
+    (glyph_max, bitmap_max_size).
+    """
+
+    __slots__ = ()
+
+    def __new__(
+        cls,
+        frame_size,
+        storage_size=None,
+        margins=None,
+        use_margins=None,
+        pixel_aspect=None,
+        font_scale=None,
+        hinting=None,
+        line_spacing=None,
+        line_position=None,
+        fonts=(None, "sans-serif", enums.ASS_FONTPROVIDER_AUTODETECT, None, 1),
+        shaper=None,
+        cache_limits=None,
+    ):
+        return super().__new__(
+            cls,
+            tuple(frame_size),
+            None if storage_size is None else tuple(storage_size),
+            None if margins is None else tuple(margins),
+            use_margins,
+            pixel_aspect,
+            font_scale,
+            hinting,
+            line_spacing,
+            line_position,
+            None if fonts is None else tuple(fonts),
+            shaper,
+            None if cache_limits is None else tuple(cache_limits),
+        )
+
+    def apply(self, renderer):
+        """Apply the settings to a renderer.
+
+        :param renderer: ASS_Renderer
+        """
+        renderer.ass_set_frame_size(*self.frame_size)
+        if self.storage_size is not None:
+            renderer.ass_set_storage_size(*self.storage_size)
+        if self.margins is not None:
+            renderer.ass_set_margins(*self.margins)
+        if self.use_margins is not None:
+            renderer.ass_set_use_margins(self.use_margins)
+        if self.pixel_aspect is not None:
+            renderer.ass_set_pixel_aspect(self.pixel_aspect)
+        if self.font_scale is not None:
+            renderer.ass_set_font_scale(self.font_scale)
+        if self.hinting is not None:
+            renderer.ass_set_hinting(self.hinting)
+        if self.line_spacing is not None:
+            renderer.ass_set_line_spacing(self.line_spacing)
+        if self.line_position is not None:
+            renderer.ass_set_line_position(self.line_position)
+        if self.fonts is not None:
+            renderer.ass_set_fonts(*self.fonts)
+        if self.shaper is not None:
+            renderer.ass_set_sharper(self.shaper)
+        if self.cache_limits is not None:
+            renderer.ass_set_cache_limits(*self.cache_limits)
+
+    def create(self, ass_library):
+        """Create a renderer with these settings.
+
+        :param ass_library: ASS_Library handle
+        :return: a new ASS_Renderer object
+        """
+        renderer = ASS_Renderer(ass_library)
+        self.apply(renderer)
+        return renderer
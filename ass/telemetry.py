@@ -0,0 +1,157 @@
+#   © 2019 Luni-4 <luni-4@hotmail.it>
+#   https://github.com/bubblesub/pyass
+#
+#   This program is free software: you can redistribute it and/or modify it
+#   under the terms of the GNU Lesser General Public License as published
+#   by the Free Software Foundation, either version 3 of the License,
+#   or (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty
+#   of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#   See the GNU Lesser General Public License for more details.
+#
+#   You should have received a copy of the GNU Lesser General Public License
+#   along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Per-frame render telemetry.
+"""
+
+import numpy
+
+from .arrays import image_array
+
+__all__ = ["FRAME_DTYPE", "RenderTelemetry"]
+
+FRAME_DTYPE = numpy.dtype(
+    [
+        ("now", numpy.int64),
+        ("wall_ns", numpy.int64),
+        ("images", numpy.int32),
+        ("area", numpy.int64),
+        ("detect_change", numpy.int8),
+    ]
+)
+
+
+class RenderTelemetry:
+    """Ring buffer of the last rendered frames.
+
+    Every frame records its timestamp, the wall time of ass_render_frame, the
+    number of ASS_Image nodes, their total bitmap area in pixels and the
+    detect_change value.
+    """
+
+    def __init__(self, capacity=1024, exporter=None):
+        """Allocate the buffer.
+
+        :param capacity: number of frames kept
+        :param exporter: function called with a numpy array of FRAME_DTYPE
+                         every time capacity new frames were recorded, and on
+                         flush(), so that no frame is lost
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.exporter = exporter
+        self._frames = numpy.zeros(capacity, FRAME_DTYPE)
+        self._count = 0
+        self._exported = 0
+        self._images = 0
+        self._area = 0
+
+    def __len__(self):
+        return min(self._count, self.capacity)
+
+    @property
+    def count(self):
+        """Number of frames recorded since the creation or the last clear.
+        """
+        return self._count
+
+    def record(self, now, wall_ns, image, detect_change):
+        """Record a rendered frame.
+
+        :param now: video timestamp in milliseconds
+        :param wall_ns: rendering time in nanoseconds
+        :param image: first ASS_Image of the frame, or None
+        :param detect_change: detect_change value of the frame
+        """
+        # An unchanged frame has the images of the previous one
+        if detect_change or not self._count:
+            images = image_array(image)
+            area = images["w"].astype(numpy.int64) * images["h"]
+            self._images = len(images)
+            self._area = int(area.sum())
+
+        self._frames[self._count % self.capacity] = (
+            now,
+            wall_ns,
+            self._images,
+            self._area,
+            detect_change,
+        )
+        self._count += 1
+
+        if (
+            self.exporter is not None
+            and self._count - self._exported >= self.capacity
+        ):
+            self.flush()
+
+    def frames(self):
+        """Return the frames kept in the buffer, oldest first.
+
+        :return: numpy array of FRAME_DTYPE
+        """
+        start = self._count % self.capacity
+        if self._count < self.capacity:
+            return self._frames[:start].copy()
+        return numpy.concatenate(
+            (self._frames[start:], self._frames[:start])
+        )
+
+    def flush(self):
+        """Pass the frames recorded since the last export to the exporter.
+        """
+        pending = min(self._count - self._exported, self.capacity)
+        self._exported = self._count
+        if self.exporter is not None and pending:
+            self.exporter(self.frames()[-pending:])
+
+    def clear(self):
+        """Drop the recorded frames, without exporting them.
+        """
+        self._count = 0
+        self._exported = 0
+
+    def summary(self, percentiles=(50, 90, 99)):
+        """Summarize the frames kept in the buffer.
+
+        :param percentiles: percentiles to compute, between 0 and 100
+        :return: dict with the number of frames, the fraction of frames
+                 that changed and, for wall_ms, images and area, a dict
+                 mapping "p<percentile>" and "max" to values
+        """
+        frames = self.frames()
+        result = {"frames": len(frames), "changed": 0.0}
+        if len(frames):
+            result["changed"] = float((frames["detect_change"] != 0).mean())
+        columns = {
+            "wall_ms": frames["wall_ns"] / 1e6,
+            "images": frames["images"],
+            "area": frames["area"],
+        }
+        for name, values in columns.items():
+            if not len(values):
+                result[name] = {}
+                continue
+            stats = dict(
+                zip(
+                    ("p{:g}".format(p) for p in percentiles),
+                    numpy.percentile(values, percentiles).tolist(),
+                )
+            )
+            stats["max"] = values.max().item()
+            result[name] = stats
+        return result
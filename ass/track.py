@@ -15,10 +15,42 @@
 #   along with this program. If not, see <http://www.gnu.org/licenses/>.
 
 
-from ctypes import c_char_p, cast
+import threading
+from ctypes import c_char_p, cast, string_at
 
 from . import enums, libass
-from .utils import LibassError, encode_str, get_encoded_path
+from .utils import (
+    LibassError,
+    encode_str,
+    get_buffer_pointer,
+    get_encoded_path,
+    run_in_executor,
+)
+
+# Header making libass parse the following lines as events
+_EVENTS_HEADER = (
+    b"[Events]\n"
+    b"Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, "
+    b"Effect, Text\n"
+)
+
+
+def _encode_field(value, name, separators):
+    if isinstance(value, str):
+        value = value.encode()
+    if any(c in value for c in separators):
+        raise LibassError("Invalid character in {} {!r}".format(name, value))
+    return value
+
+
+def _get_read_order(data):
+    """Parse the ReadOrder field at the start of a Matroska chunk.
+    """
+    field = bytes(memoryview(data)[:32]).split(b",", 1)[0]
+    try:
+        return int(field)
+    except ValueError:
+        return None
 
 
 class ASS_Track:
@@ -30,6 +62,10 @@ class ASS_Track:
 
         :param ass_library: ASS_Library handle
         """
+        self._event_index = None
+        # libass writes to the events while rendering them, so renderers
+        # sharing the track hold this lock while they render it
+        self.render_lock = threading.Lock()
         self.track = libass.ass_new_track(ass_library.library)
         if not self.track:
             raise LibassError("Cannot allocate a new empty track object")
@@ -46,6 +82,7 @@ class ASS_Track:
 
         :return: newly allocated event id
         """
+        self._event_index = None
         return libass.ass_alloc_event(self.track)
 
     def ass_free_style(self, sid):
@@ -60,6 +97,7 @@ class ASS_Track:
 
         :param eid: event id
         """
+        self._event_index = None
         return libass.ass_free_event(self.track, int(eid))
 
     def ass_process_data(self, data):
@@ -67,6 +105,7 @@ class ASS_Track:
 
         :param data: string to parse
         """
+        self._event_index = None
         libass.ass_process_data(self.track, encode_str(data), len(data))
 
     def ass_process_codec_private(self, data):
@@ -75,6 +114,7 @@ class ASS_Track:
 
         :param data: string to parse
         """
+        self._event_index = None
         libass.ass_process_codec_private(
             self.track, encode_str(data), len(data)
         )
@@ -86,6 +126,7 @@ class ASS_Track:
         :param timecode: starting time of the event (milliseconds)
         :param duration: duration of the event (milliseconds)
         """
+        self._event_index = None
         libass.ass_process_chunk(
             self.track,
             encode_str(data),
@@ -94,6 +135,95 @@ class ASS_Track:
             int(duration),
         )
 
+    def process_chunks(self, chunks):
+        """Parse many chunks of subtitle stream data, in Matroska format.
+
+        :param chunks: iterable of (data, timecode, duration) tuples, where
+                       data is a str or any contiguous buffer (bytes,
+                       memoryview...) and times are in milliseconds
+        :return: list of the ReadOrder values of the chunks that were
+                 dropped because they did not add an event, such as the
+                 duplicates discarded by ass_set_check_readorder()
+        """
+        self._event_index = None
+        process_chunk = libass.ass_process_chunk
+        track = self.track
+        contents = track[0]
+        dropped = []
+        for data, timecode, duration in chunks:
+            pointer, size, owner = get_buffer_pointer(data)
+            n_events = contents.n_events
+            process_chunk(track, pointer, size, int(timecode), int(duration))
+            if contents.n_events == n_events:
+                dropped.append(_get_read_order(owner))
+        return dropped
+
+    async def process_chunks_async(self, chunks, max_pending=1024):
+        """Parse chunks coming from an async iterable.
+
+        Chunks are parsed in batches on the async API executor, while the
+        iterable is consumed; at most max_pending chunks are buffered, after
+        that the iterable is not consumed until a batch has been parsed. On
+        errors, the batch being parsed is completed before the exception is
+        raised.
+
+        :param chunks: async iterable of (data, timecode, duration) tuples,
+                       see process_chunks()
+        :param max_pending: maximum number of buffered chunks
+        :return: list of the ReadOrder values of the dropped chunks
+        """
+        import asyncio
+
+        queue = asyncio.Queue(max_pending)
+        dropped = []
+        parsing = None
+
+        async def consume():
+            nonlocal parsing
+            while True:
+                batch = [await queue.get()]
+                while not queue.empty():
+                    batch.append(queue.get_nowait())
+                end = batch[-1] is None
+                if end:
+                    batch.pop()
+                if batch:
+                    parsing = asyncio.ensure_future(
+                        run_in_executor(self.process_chunks, batch)
+                    )
+                    # Shielded, so that cancelling the consumer leaves the
+                    # batch running and lets it be waited for below
+                    dropped.extend(await asyncio.shield(parsing))
+                if end:
+                    return
+
+        async def put(item):
+            if not queue.full():
+                queue.put_nowait(item)
+                return
+            putter = asyncio.ensure_future(queue.put(item))
+            await asyncio.wait(
+                (putter, consumer), return_when=asyncio.FIRST_COMPLETED
+            )
+            if not putter.done():
+                # The consumer failed, raise its exception
+                putter.cancel()
+                await consumer
+
+        consumer = asyncio.ensure_future(consume())
+        try:
+            async for chunk in chunks:
+                await put(chunk)
+            await put(None)
+            await consumer
+        finally:
+            consumer.cancel()
+            if parsing is not None:
+                # The executor thread cannot be interrupted, do not return
+                # while it is still changing the track
+                await asyncio.wait((parsing,))
+        return dropped
+
     def ass_set_check_readorder(self, check_readorder):
         """Set whether the ReadOrder field when processing a packet with
            ass_process_chunk() should be used for eliminating duplicates.
@@ -108,6 +238,7 @@ class ASS_Track:
     def ass_flush_events(self):
         """Flush buffered events.
         """
+        self._event_index = None
         libass.ass_flush_events(self.track)
 
     def ass_read_styles(self, fname, codepage):
@@ -121,6 +252,104 @@ class ASS_Track:
         ):
             raise LibassError("Can't read styles from {}".format(fname))
 
+    def add_events(
+        self,
+        starts,
+        durations,
+        styles,
+        texts,
+        layers=None,
+        names=None,
+        effects=None,
+    ):
+        """Append many events in a single libass call.
+
+        The events are parsed by libass, which owns their strings; times are
+        then written with millisecond precision through events_array. They
+        are fed after an [Events] header with the standard Format line; the
+        previous event_format of the track is restored afterwards, but the
+        libass parser is left in the [Events] section, as if the track data
+        had ended with these events.
+
+        :param starts: start times in milliseconds
+        :param durations: durations in milliseconds
+        :param styles: style ids or names of styles of the track
+        :param texts: event texts, without line breaks
+        :param layers: layers, 0 if omitted
+        :param names: actor names, empty if omitted
+        :param effects: effects, empty if omitted
+        :return: numpy array of the new event ids
+        """
+        import numpy
+
+        n = len(texts)
+        layers = [0] * n if layers is None else layers
+        names = [b""] * n if names is None else names
+        effects = [b""] * n if effects is None else effects
+        starts = numpy.asarray(starts, dtype=numpy.int64)
+        durations = numpy.asarray(durations, dtype=numpy.int64)
+        if any(
+            len(column) != n
+            for column in (starts, durations, styles, layers, names, effects)
+        ):
+            raise LibassError("All the event columns must have one value each")
+
+        track = self.track[0]
+        if not track.n_styles:
+            raise LibassError("The track has no styles")
+
+        style_names = [
+            string_at(name) if name else b""
+            for name in self.styles_array["Name"].tolist()
+        ]
+        style_ids = None
+        if n and not isinstance(styles[0], (str, bytes)):
+            style_ids = numpy.asarray(styles, dtype=numpy.int32)
+            if style_ids.min() < 0 or style_ids.max() >= len(style_names):
+                raise LibassError("Invalid style id")
+            styles = [style_names[sid] for sid in style_ids.tolist()]
+        else:
+            styles = [
+                _encode_field(style, "style", b",\r\n") for style in styles
+            ]
+            known = set(style_names)
+            if any(style not in known for style in styles):
+                raise LibassError("Invalid style name")
+
+        lines = [_EVENTS_HEADER]
+        for layer, style, name, effect, text in zip(
+            layers, styles, names, effects, texts
+        ):
+            lines.append(
+                b"Dialogue: %d,0:00:00.00,0:00:00.00,%s,%s,0,0,0,%s,%s\n"
+                % (
+                    int(layer),
+                    style,
+                    _encode_field(name, "name", b",\r\n"),
+                    _encode_field(effect, "effect", b",\r\n"),
+                    _encode_field(text, "text", b"\r\n"),
+                )
+            )
+        data = b"".join(lines)
+
+        first = track.n_events
+        event_format = track.event_format
+        self._event_index = None
+        libass.ass_process_data(self.track, data, len(data))
+        if event_format:
+            line = b"Format: " + event_format + b"\n"
+            libass.ass_process_data(self.track, line, len(line))
+        if track.n_events - first != n:
+            raise LibassError("Cannot parse the events")
+
+        events = self.events_array[first:]
+        events["Start"] = starts
+        events["Duration"] = durations
+        events["ReadOrder"] = numpy.arange(first, first + n)
+        if style_ids is not None:
+            events["Style"] = style_ids
+        return numpy.arange(first, first + n)
+
     def ass_step_sub(self, now, movement):
         """Calculates timeshift from now to the start of some other subtitle
            event, depending on movement parameter.
@@ -130,6 +359,141 @@ class ASS_Track:
         """
         return libass.ass_step_sub(self.track, int(now), int(movement))
 
+    @property
+    def events_array(self):
+        """numpy structured array sharing the memory of the track events.
+
+        String fields hold the address of the C string. The array is valid
+        until events are allocated, freed or parsed, since libass may then
+        move them.
+        """
+        from .arrays import EVENT_DTYPE, struct_array
+
+        track = self.track[0]
+        return struct_array(track.events, track.n_events, EVENT_DTYPE)
+
+    @property
+    def styles_array(self):
+        """numpy structured array sharing the memory of the track styles.
+
+        String fields hold the address of the C string. The array is valid
+        until styles are allocated, freed or parsed, since libass may then
+        move them.
+        """
+        from .arrays import STYLE_DTYPE, struct_array
+
+        track = self.track[0]
+        return struct_array(track.styles, track.n_styles, STYLE_DTYPE)
+
+    def retime(self, offset=0, scale=1.0, timecodes=None):
+        """Rewrite the times of all events in one vectorized pass.
+
+        Start and end times are first remapped through timecodes, then
+        multiplied by scale and shifted by offset.
+
+        :param offset: shift in milliseconds
+        :param scale: time scaling factor, e.g. (24000 / 1001) / 25 to speed
+                      up 23.976 fps subtitles to 25 fps
+        :param timecodes: optional pair of increasing sequences (src, dst) of
+                          times in milliseconds; times are mapped by linear
+                          interpolation between them, and shifted like the
+                          nearest point outside of the range
+        """
+        import numpy
+
+        events = self.events_array
+        starts = events["Start"].astype(numpy.float64)
+        ends = starts + events["Duration"]
+
+        if timecodes is not None:
+            src, dst = (numpy.asarray(t, numpy.float64) for t in timecodes)
+            if len(src) != len(dst) or not len(src):
+                raise LibassError("Timecodes must be two non-empty sequences")
+
+            def remap(times):
+                return numpy.select(
+                    [times < src[0], times > src[-1]],
+                    [dst[0] + times - src[0], dst[-1] + times - src[-1]],
+                    numpy.interp(times, src, dst),
+                )
+
+            starts = remap(starts)
+            ends = remap(ends)
+
+        starts = numpy.rint(starts * scale + offset)
+        ends = numpy.rint(ends * scale + offset)
+        events["Start"] = starts
+        events["Duration"] = numpy.maximum(ends - starts, 0)
+        self._event_index = None
+
+    @property
+    def event_index(self):
+        """EventIndex over the events of the track.
+
+        The index is rebuilt after events are allocated, freed or parsed
+        through this object; call invalidate_index() after changing event
+        times directly.
+        """
+        if self._event_index is None:
+            from .index import EventIndex, is_dynamic
+
+            events = self.events_array
+            self._event_index = EventIndex(
+                events["Start"],
+                events["Duration"],
+                [
+                    bool(text) and is_dynamic(string_at(text))
+                    for text in events["Text"].tolist()
+                ],
+            )
+        return self._event_index
+
+    def invalidate_index(self):
+        """Drop the event index, it is rebuilt on the next query.
+        """
+        self._event_index = None
+
+    def active_at(self, t):
+        """Return the events visible at a time.
+
+        :param t: time in milliseconds
+        :return: sorted numpy array of event ids
+        """
+        return self.event_index.active_at(t)
+
+    def active_in(self, t0, t1):
+        """Return the events visible at some point of a time range.
+
+        :param t0: start of the range in milliseconds
+        :param t1: end of the range in milliseconds, excluded
+        :return: sorted numpy array of event ids
+        """
+        return self.event_index.active_in(t0, t1)
+
+    def change_points(self, t0, t1):
+        """Find when the set of visible events changes in a time range.
+
+        Events whose text has time-dependent override tags (\\t, \\move,
+        \\fad, \\fade, karaoke) are reported as dynamic ranges, which need to
+        be rendered on every frame; elsewhere a frame rendered at a change
+        point can be reused until the next one.
+
+        :param t0: start of the range in milliseconds
+        :param t1: end of the range in milliseconds, excluded
+        :return: ChangePoints holding the sorted change times and the merged
+                 list of (start, end) dynamic ranges
+        """
+        return self.event_index.change_points(t0, t1)
+
+    def is_empty(self, t):
+        """Whether no event is visible at a time, in which case rendering
+           the frame can be skipped.
+
+        :param t: time in milliseconds
+        :return: True if no event is visible
+        """
+        return self.event_index.is_empty(t)
+
     def __getattr__(self, name):
         track = self.track[0]
 
@@ -14,7 +14,18 @@
 #   You should have received a copy of the GNU Lesser General Public License
 #   along with this program. If not, see <http://www.gnu.org/licenses/>.
 
+import ctypes
+import functools
+import os
 import sys
+import threading
+
+# In debug mode ASS_Image objects check that they are used before the next
+# ass_render_frame call of their renderer
+DEBUG = bool(os.environ.get("PYASS_DEBUG"))
+
+_executor = None
+_executor_lock = threading.Lock()
 
 
 def encode_str(string):
@@ -29,6 +40,28 @@ def get_encoded_path(path):
     return str(path).encode(sys.getfilesystemencoding())
 
 
+def get_buffer_pointer(buf):
+    """Get a char pointer to the memory of a buffer, without copying it.
+
+    :param buf: str, or any C-contiguous buffer (bytes, bytearray,
+                memoryview, mmap.mmap, numpy array...)
+    :return: char pointer, size in bytes and the object owning the memory,
+             which must be kept alive while the pointer is used
+    """
+    if isinstance(buf, str):
+        buf = buf.encode()
+    if isinstance(buf, bytes):
+        return buf, len(buf), buf
+
+    import numpy
+
+    view = memoryview(buf)
+    if not view.c_contiguous:
+        raise LibassError("Buffer must be C-contiguous")
+    array = numpy.frombuffer(view, dtype=numpy.uint8)
+    return ctypes.cast(array.ctypes.data, ctypes.c_char_p), view.nbytes, array
+
+
 class LibassError(Exception):
     """Error class for Libass."""
 
@@ -38,3 +71,43 @@ class LibassError(Exception):
         :param msg: message of error
         """
         super().__init__(msg)
+
+
+def set_executor(executor):
+    """Set the executor running the blocking calls of the async API.
+
+    :param executor: concurrent.futures.Executor, or None to go back to the
+                     default bounded thread pool
+    """
+    global _executor
+    with _executor_lock:
+        _executor = executor
+
+
+def get_executor():
+    """Return the executor running the blocking calls of the async API.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+
+            _executor = ThreadPoolExecutor(
+                min(32, (os.cpu_count() or 1) + 4),
+                thread_name_prefix="pyass",
+            )
+        return _executor
+
+
+async def run_in_executor(func, *args):
+    """Run a blocking function in the async API executor.
+
+    :param func: function to call
+    :param args: arguments of the function
+    :return: value returned by the function
+    """
+    import asyncio
+
+    return await asyncio.get_running_loop().run_in_executor(
+        get_executor(), functools.partial(func, *args)
+    )
@@ -0,0 +1,87 @@
+"""Measure the per-call overhead of the ctypes and cffi backends
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from importlib.util import find_spec
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import ass  # noqa: E402
+from ass import libass  # noqa: E402
+
+
+def get_calls(library, renderer, track):
+    # Short calls, where the cost of the bindings dominates
+    return {
+        "ass_library_version": (),
+        "ass_set_frame_size": (renderer._renderer, 1280, 720),
+        "ass_set_cache_limits": (renderer._renderer, 0, 0),
+        "ass_step_sub": (track.track, 0, 0),
+        "ass_flush_events": (track.track,),
+    }
+
+
+def measure(backend, calls, number, repeat):
+    results = {}
+    for name, args in calls.items():
+        func = libass.get_function(name, backend)
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(number):
+                func(*args)
+            times.append((time.perf_counter() - start) / number * 1e9)
+        results[name] = {
+            "min_ns": min(times),
+            "median_ns": statistics.median(times),
+        }
+    return results
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip(),
+        prog="{} {}".format(os.path.basename(sys.executable), "bench_backend"),
+    )
+    parser.add_argument(
+        "--number", type=int, default=100000, help="Calls per measurement",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="Number of measurements",
+    )
+
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    library = ass.ASS_Library()
+    renderer = ass.ASS_Renderer(library)
+    track = ass.ASS_Track(library)
+    calls = get_calls(library, renderer, track)
+
+    backends = ["ctypes"]
+    if find_spec("ass._libass_cffi"):
+        backends.append("cffi")
+
+    result = {
+        "benchmark": "backend",
+        "default_backend": libass.BACKEND,
+        "number": args.number,
+        "repeat": args.repeat,
+    }
+    for backend in backends:
+        result[backend] = measure(backend, calls, args.number, args.repeat)
+    print(json.dumps(result))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""Measure the time taken by `import ass`
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Import ass in a fresh interpreter and report what got loaded
+IMPORT_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+import ass
+elapsed = time.perf_counter() - start
+print(elapsed, "numpy" in sys.modules, ass.libass._lib is not None)
+"""
+
+
+def measure(runs):
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        p for p in (ROOT, env.get("PYTHONPATH")) if p
+    )
+    times = []
+    numpy_loaded = libass_loaded = False
+    for _ in range(runs):
+        output = subprocess.check_output(
+            [sys.executable, "-c", IMPORT_SCRIPT], env=env, cwd=ROOT
+        ).split()
+        times.append(float(output[0]) * 1000)
+        numpy_loaded |= output[1] == b"True"
+        libass_loaded |= output[2] == b"True"
+    return {
+        "benchmark": "import",
+        "runs": runs,
+        "min_ms": min(times),
+        "median_ms": statistics.median(times),
+        "numpy_loaded": numpy_loaded,
+        "libass_loaded": libass_loaded,
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip(),
+        prog="{} {}".format(os.path.basename(sys.executable), "bench_import"),
+    )
+    parser.add_argument(
+        "--runs", type=int, default=20, help="Number of interpreters to start",
+    )
+    parser.add_argument(
+        "--max-ms",
+        type=float,
+        default=None,
+        help="Fail if the median import time is above this value",
+    )
+
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    result = measure(args.runs)
+    print(json.dumps(result))
+
+    if result["numpy_loaded"] or result["libass_loaded"]:
+        return 1
+    if args.max_ms is not None and result["median_ms"] > args.max_ms:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
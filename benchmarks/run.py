@@ -0,0 +1,152 @@
+"""Measure parse, render and compose throughput on a synthetic workload
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy  # noqa: E402
+import workload  # noqa: E402
+
+import ass  # noqa: E402
+from ass import libass  # noqa: E402
+from ass.compose import blend  # noqa: E402
+
+
+def best_of(runs, func):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return {"min_s": min(times), "median_s": statistics.median(times)}
+
+
+def rates(timing, count, unit):
+    elapsed = timing["min_s"]
+    timing[unit + "_per_s"] = count / elapsed if elapsed else 0.0
+    return timing
+
+
+def bench_parse(library, load, runs):
+    script = workload.generate_script(load).encode()
+    header = workload.generate_header(load)
+    chunks = workload.generate_chunks(load)
+
+    def read_memory():
+        library.ass_read_memory(script, None)
+
+    def process_chunks():
+        track = ass.ASS_Track(library)
+        track.ass_process_codec_private(header)
+        track.process_chunks(chunks)
+
+    return {
+        "script_bytes": len(script),
+        "read_memory": rates(
+            best_of(runs, read_memory), load.events, "events"
+        ),
+        "process_chunks": rates(
+            best_of(runs, process_chunks), len(chunks), "events"
+        ),
+    }
+
+
+def bench_render(library, load, args):
+    track = library.ass_read_memory(
+        workload.generate_script(load).encode(), None
+    )
+    config = ass.RendererConfig(frame_size=(load.width, load.height))
+    renderer = config.create(library)
+    step = 1000 / args.fps
+    timestamps = [int(args.start + i * step) for i in range(args.frames)]
+
+    def render():
+        # A fresh renderer would measure cold caches, reuse the warm one
+        for _ in renderer.render_many(track, timestamps):
+            pass
+
+    frame = numpy.zeros((load.height, load.width, 3), numpy.uint8)
+    compose_times = []
+    images = []
+
+    def compose(image):
+        start = time.perf_counter()
+        images.append(blend(image, frame))
+        compose_times.append(time.perf_counter() - start)
+
+    # Renders once to warm up the caches and measures the composition.
+    # render_many only composes the frames that changed
+    for _ in renderer.render_many(track, timestamps, compose):
+        pass
+    composed = len(compose_times)
+    compose_total = sum(compose_times)
+
+    return {
+        "frames": len(timestamps),
+        "images_per_frame": statistics.mean(images) if images else 0,
+        "render": rates(best_of(args.runs, render), len(timestamps), "frames"),
+        "compose": {
+            "frames": composed,
+            "total_s": compose_total,
+            "frames_per_s": composed / compose_total if composed else 0.0,
+        },
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip(),
+        prog="{} {}".format(os.path.basename(sys.executable), "run"),
+    )
+    parser.add_argument(
+        "--runs", type=int, default=3, help="Measurements of each benchmark",
+    )
+    parser.add_argument(
+        "--frames", type=int, default=240, help="Number of frames rendered",
+    )
+    parser.add_argument(
+        "--fps", type=float, default=24000 / 1001, help="Video frame rate",
+    )
+    parser.add_argument(
+        "--start", type=int, default=60000, help="First frame timestamp (ms)",
+    )
+    parser.add_argument(
+        "-o", "--output", help="Write the results to this file",
+    )
+    workload.add_arguments(parser.add_argument_group("workload"))
+
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    load = workload.from_arguments(args)
+
+    library = ass.ASS_Library()
+    result = {
+        "benchmark": "throughput",
+        "libass_version": ass.get_version(),
+        "backend": libass.BACKEND,
+        "python": sys.version.split()[0],
+        "workload": load._asdict(),
+        "parse": bench_parse(library, load, args.runs),
+    }
+    result.update(bench_render(library, load, args))
+
+    output = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w") as handle:
+            handle.write(output + "\n")
+    print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,248 @@
+"""Generate synthetic ASS scripts for the benchmarks
+"""
+
+import argparse
+import os
+import random
+import sys
+from collections import namedtuple
+
+Workload = namedtuple(
+    "Workload",
+    (
+        "events",
+        "span_ms",
+        "overlap",
+        "karaoke",
+        "blur",
+        "be",
+        "drawings",
+        "cjk",
+        "width",
+        "height",
+        "seed",
+    ),
+)
+Workload.__new__.__defaults__ = (
+    1000,  # events
+    600000,  # span_ms
+    2.0,  # overlap
+    0.0,  # karaoke
+    0.0,  # blur
+    0,  # be
+    0.0,  # drawings
+    0.0,  # cjk
+    1920,  # width
+    1080,  # height
+    0,  # seed
+)
+Workload.__doc__ = """Parameters of a synthetic script.
+
+events: number of Dialogue events
+span_ms: time covered by the events, in milliseconds
+overlap: average number of events visible at the same time
+karaoke: fraction of the events that are karaoke lines, one \\k per word
+blur: \\blur strength applied to every event, 0 to disable
+be: \\be strength applied to every event, 0 to disable
+drawings: fraction of the events that are vector drawings
+cjk: fraction of the text events written in CJK characters
+width, height: PlayResX and PlayResY of the script
+seed: seed of the random generator
+"""
+
+HEADER = """[Script Info]
+ScriptType: v4.00+
+PlayResX: {width}
+PlayResY: {height}
+WrapStyle: 0
+ScaledBorderAndShadow: yes
+
+[V4+ Styles]
+Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, \
+OutlineColour, BackColour, Bold, Italic, Underline, StrikeOut, ScaleX, \
+ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, Alignment, MarginL, \
+MarginR, MarginV, Encoding
+Style: Default,sans-serif,{font_size},&H00FFFFFF,&H000000FF,&H00000000,\
+&H80000000,0,0,0,0,100,100,0,0,1,2,1,2,20,20,20,1
+Style: Top,sans-serif,{font_size},&H0000FFFF,&H000000FF,&H00000000,\
+&H80000000,0,0,0,0,100,100,0,0,1,2,1,8,20,20,20,1
+
+"""
+
+EVENTS_HEADER = """[Events]
+Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, \
+Text
+"""
+
+WORDS = (
+    "the quick brown fox jumps over lazy dog subtitle render frame glyph "
+    "bitmap outline shadow border karaoke typeset sign song"
+).split()
+
+# Common CJK ideographs and kana
+CJK = (
+    "日本語字幕東京時間今日明日世界言葉心夢空海山川花雪月星光影"
+    "あいうえおかきくけこ"
+)
+
+
+def _format_time(ms):
+    cs = ms // 10
+    return "{}:{:02d}:{:02d}.{:02d}".format(
+        cs // 360000, cs // 6000 % 60, cs // 100 % 60, cs % 100
+    )
+
+
+def _drawing(rng, width, height):
+    x, y = rng.randrange(width // 2), rng.randrange(height // 2)
+    points = " ".join(
+        "{} {}".format(rng.randrange(400), rng.randrange(400))
+        for _ in range(rng.randrange(3, 12))
+    )
+    return "{{\\pos({},{})\\p1}}m 0 0 l {}{{\\p0}}".format(x, y, points)
+
+
+def _text(rng, workload):
+    words = rng.randrange(3, 10)
+    if rng.random() < workload.cjk:
+        chunks = [
+            "".join(rng.choice(CJK) for _ in range(rng.randrange(1, 4)))
+            for _ in range(words)
+        ]
+        separator = ""
+    else:
+        chunks = [rng.choice(WORDS) for _ in range(words)]
+        separator = " "
+
+    if rng.random() < workload.karaoke:
+        chunks = [
+            "{{\\k{}}}{}".format(rng.randrange(10, 60), chunk)
+            for chunk in chunks
+        ]
+    return separator.join(chunks)
+
+
+def generate_events(workload):
+    """Generate the events of a workload.
+
+    :param workload: Workload
+    :return: list of (start, end, style, text) tuples, times in milliseconds,
+             sorted by start time
+    """
+    rng = random.Random(workload.seed)
+    duration = max(
+        1, int(workload.overlap * workload.span_ms / max(workload.events, 1))
+    )
+    tags = ""
+    if workload.blur:
+        tags += "\\blur{:g}".format(workload.blur)
+    if workload.be:
+        tags += "\\be{}".format(workload.be)
+
+    events = []
+    for _ in range(workload.events):
+        start = rng.randrange(max(1, workload.span_ms - duration))
+        if rng.random() < workload.drawings:
+            text = _drawing(rng, workload.width, workload.height)
+        else:
+            text = _text(rng, workload)
+        if tags:
+            text = "{" + tags + "}" + text
+        style = "Top" if rng.random() < 0.2 else "Default"
+        events.append((start, start + duration, style, text))
+    events.sort()
+    return events
+
+
+def generate_header(workload):
+    """Generate the [Script Info] and [V4+ Styles] sections of a workload,
+       as used for the Codec Private data of Matroska streams.
+
+    :param workload: Workload
+    :return: str
+    """
+    return HEADER.format(
+        width=workload.width,
+        height=workload.height,
+        font_size=max(1, workload.height // 18),
+    )
+
+
+def generate_script(workload):
+    """Generate a whole ASS script.
+
+    :param workload: Workload
+    :return: str
+    """
+    lines = [generate_header(workload), EVENTS_HEADER]
+    for start, end, style, text in generate_events(workload):
+        lines.append(
+            "Dialogue: 0,{},{},{},,0,0,0,,{}\n".format(
+                _format_time(start), _format_time(end), style, text
+            )
+        )
+    return "".join(lines)
+
+
+def generate_chunks(workload):
+    """Generate the events of a workload as Matroska chunks.
+
+    :param workload: Workload
+    :return: list of (data, timecode, duration) tuples for
+             ASS_Track.process_chunks()
+    """
+    return [
+        (
+            "{},0,{},,0,0,0,,{}".format(read_order, style, text).encode(),
+            start,
+            end - start,
+        )
+        for read_order, (start, end, style, text) in enumerate(
+            generate_events(workload)
+        )
+    ]
+
+
+def add_arguments(parser):
+    """Add the workload options to an argument parser.
+
+    :param parser: argparse.ArgumentParser
+    """
+    defaults = Workload()
+    for field in Workload._fields:
+        default = getattr(defaults, field)
+        parser.add_argument(
+            "--" + field.replace("_", "-"),
+            type=type(default),
+            default=default,
+            help="Default: {}".format(default),
+        )
+
+
+def from_arguments(args):
+    """Build a Workload from parsed arguments.
+
+    :param args: argparse.Namespace filled by a parser set up with
+                 add_arguments()
+    :return: Workload
+    """
+    return Workload(*(getattr(args, field) for field in Workload._fields))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip(),
+        prog="{} {}".format(os.path.basename(sys.executable), "workload"),
+    )
+    add_arguments(parser)
+
+    return parser.parse_args()
+
+
+def main():
+    sys.stdout.write(generate_script(from_arguments(parse_args())))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
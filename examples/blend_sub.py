@@ -9,10 +9,10 @@ import numpy as np
 from PIL import Image
 
 import ass
+import ass.compose
 
 FRAME_WIDTH = 1280
 FRAME_HEIGHT = 720
-FRAME_STRIDE = FRAME_WIDTH * 3
 
 
 def ic(level, fmt, *args, data=None):
@@ -30,37 +30,8 @@ def print_font_providers(ass_library):
     print()
 
 
-def blend_single(img, frame):
-    opacity = 255 - (img.color & 0xFF)
-    r = img.color >> 24
-    g = (img.color >> 16) & 0xFF
-    b = (img.color >> 8) & 0xFF
-
-    dst = frame[img.dst_y * FRAME_STRIDE + img.dst_x * 3 :]
-    for y in range(0, img.h):
-        src_step = y * img.stride
-        frame_step = y * FRAME_STRIDE
-        for x in range(0, img.w):
-            k = int(img.image[src_step + x]) * opacity / 255
-            frame_row_step = frame_step + x * 3
-            dst[frame_row_step] = (
-                k * b + (255 - k) * dst[frame_row_step]
-            ) / 255
-            dst[frame_row_step + 1] = (
-                k * g + (255 - k) * dst[frame_row_step + 1]
-            ) / 255
-            dst[frame_row_step + 2] = (
-                k * r + (255 - k) * dst[frame_row_step + 2]
-            ) / 255
-
-
 def blend(img, frame):
-    count_blended = 0
-    while img is not None:
-        blend_single(img, frame)
-        count_blended += 1
-        img = img.next_image
-
+    count_blended = ass.compose.blend(img, frame, "RGB")
     print("{} images blended".format(count_blended))
 
 
@@ -114,15 +85,13 @@ def main():
     )
 
     # Generate a new frame
-    frame = np.full((FRAME_HEIGHT * FRAME_STRIDE,), 63, dtype=np.uint8)
+    frame = np.full((FRAME_HEIGHT, FRAME_WIDTH, 3), 63, dtype=np.uint8)
 
     # Blend image
     blend(ass_image, frame)
 
     # Save image as png
-    im = Image.fromarray(
-        frame[::3].reshape(FRAME_HEIGHT, FRAME_WIDTH), mode="P"
-    )
+    im = Image.fromarray(frame, mode="RGB")
     im.save(args.image_file)
 
 
@@ -12,6 +12,15 @@ if set(["bdist_wheel", "--plat-name", "win_amd64"]) <= set(sys.argv) or (
 ):
     data_libs = [("Scripts", libs)]
 
+# The cffi backend is optional, it needs cffi and the libass headers
+cffi_options = {}
+if os.environ.get("PYASS_CFFI"):
+    cffi_options = {
+        "setup_requires": ["cffi>=1.0.0"],
+        "install_requires": ["cffi>=1.0.0"],
+        "cffi_modules": ["ass/_cffi_build.py:ffibuilder"],
+    }
+
 setup(
     author="Luni-4",
     author_email="luni-4@hotmail.it",
@@ -32,4 +41,5 @@ setup(
     packages=find_packages(),
     package_dir={"ass": "ass"},
     package_data={"ass": ["data/*", "../COPYING", "../COPYING.LESSER"]},
+    **cffi_options,
 )
@@ -0,0 +1,102 @@
+import ctypes
+import threading
+import time
+
+import numpy
+import pytest
+
+from ass.libass import ASS_Image
+from ass.renderer import ASS_Renderer
+
+
+@pytest.fixture
+def make_images():
+    """Build a list of ASS_Image from (bitmap, color, dst_x, dst_y) tuples.
+
+    The bitmaps are 2-D uint8 arrays; the fixture keeps the buffers alive
+    until the end of the test.
+    """
+    keep = []
+
+    def factory(*specs):
+        images = []
+        for bitmap, color, dst_x, dst_y in specs:
+            bitmap = numpy.ascontiguousarray(bitmap, dtype=numpy.uint8)
+            image = ASS_Image()
+            image.h, image.w = bitmap.shape
+            image.stride = bitmap.shape[1]
+            image.bitmap = bitmap.ctypes.data_as(
+                ctypes.POINTER(ctypes.c_uint8)
+            )
+            image.color = color
+            image.dst_x = dst_x
+            image.dst_y = dst_y
+            keep.append(bitmap)
+            images.append(image)
+        for image, following in zip(images, images[1:]):
+            image.next = ctypes.pointer(following)
+        keep.extend(images)
+        return images[0] if images else None
+
+    return factory
+
+
+class FakeRenderer:
+    """Stand-in for ASS_Renderer, returning a fixed list of images."""
+
+    render_many = ASS_Renderer.render_many
+    render_frame_async = ASS_Renderer.render_frame_async
+    _render_compose = ASS_Renderer._render_compose
+    _get_async_lock = ASS_Renderer._get_async_lock
+
+    def __init__(self, config, image):
+        self._async_lock = None
+        self.config = config
+        self.image = image
+        self.rendered = []
+
+    def _render_frame(self, track, now):
+        if isinstance(track, FakeTrack):
+            track.rendering += 1
+            track.overlaps += track.rendering > 1
+            time.sleep(0.001)
+            track.rendering -= 1
+        self.rendered.append((track, now))
+        return (self.image if now >= 0 else None), 1
+
+
+class FakeConfig:
+    """Stand-in for RendererConfig, creating FakeRenderer objects."""
+
+    def __init__(self, frame_size, image=None):
+        self.frame_size = frame_size
+        self.image = image
+        self.created = []
+
+    def create(self, ass_library):
+        renderer = FakeRenderer(self, self.image)
+        self.created.append(renderer)
+        return renderer
+
+
+@pytest.fixture
+def fake_config():
+    return FakeConfig
+
+
+class FakeTrack:
+    """Stand-in for ASS_Track, noticing renders of it that overlap."""
+
+    def __init__(self, name="track"):
+        self.name = name
+        self.render_lock = threading.Lock()
+        self.rendering = 0
+        self.overlaps = 0
+
+    def __repr__(self):
+        return repr(self.name)
+
+
+@pytest.fixture
+def fake_track():
+    return FakeTrack
@@ -0,0 +1,88 @@
+import ctypes
+import types
+
+import numpy
+import pytest
+
+from ass.arrays import SNAPSHOT_DTYPE, image_array, iter_snapshot
+from ass.libass import ASS_Image
+from ass.utils import LibassError
+
+
+def strided_image(bitmap, width):
+    image = ASS_Image()
+    image.h, image.stride = bitmap.shape
+    image.w = width
+    image.bitmap = bitmap.ctypes.data_as(ctypes.POINTER(ctypes.c_uint8))
+    return image
+
+
+def test_bitmap2d_stride():
+    bitmap = numpy.arange(8, dtype=numpy.uint8).reshape(2, 4)
+    image = strided_image(bitmap, 3)
+
+    view = image.bitmap2d
+    assert view.tolist() == [[0, 1, 2], [4, 5, 6]]
+    assert view.strides == (4, 1)
+
+    bitmap[1, 0] = 42
+    assert view[1, 0] == 42
+
+
+def test_bitmap_buffer():
+    bitmap = numpy.arange(8, dtype=numpy.uint8).reshape(2, 4)
+    image = strided_image(bitmap, 3)
+
+    buf = image.bitmap_buffer
+    assert buf.shape == (2, 4)
+    assert buf.tolist() == bitmap.tolist()
+
+
+def test_empty_bitmap():
+    image = ASS_Image()
+    image.w, image.h = 3, 2
+
+    assert image.bitmap2d.shape == (2, 3)
+    assert not image.bitmap2d.any()
+    assert image.bitmap_buffer.shape == (2, 0)
+
+
+def test_stale_image():
+    bitmap = numpy.zeros((1, 1), dtype=numpy.uint8)
+    image = strided_image(bitmap, 1)
+    renderer = types.SimpleNamespace(_generation=1)
+    image._pyass_renderer = renderer
+    image._pyass_generation = 1
+    image.bitmap2d
+
+    renderer._generation = 2
+    with pytest.raises(LibassError):
+        image.bitmap2d
+    with pytest.raises(LibassError):
+        image.bitmap_buffer
+
+
+def test_image_array(make_images):
+    image = make_images(
+        ([[1, 2, 3]], 0x11223300, 4, 5),
+        ([[7], [8]], 0x445566FF, 0, 1),
+    )
+
+    images = image_array(image)
+    assert images.dtype == SNAPSHOT_DTYPE
+    assert images["w"].tolist() == [3, 1]
+    assert images["h"].tolist() == [1, 2]
+    assert images["color"].tolist() == [0x11223300, 0x445566FF]
+    assert images["dst_x"].tolist() == [4, 0]
+    assert images["dst_y"].tolist() == [5, 1]
+
+    first, second = iter_snapshot(images)
+    assert first.bitmap2d.tolist() == [[1, 2, 3]]
+    assert second.bitmap2d.tolist() == [[7], [8]]
+
+
+def test_image_array_empty():
+    images = image_array(None)
+    assert images.dtype == SNAPSHOT_DTYPE
+    assert not len(images)
+    assert list(iter_snapshot(images)) == []
@@ -0,0 +1,126 @@
+import builtins
+import warnings
+
+import pytest
+
+from ass import cache
+from ass.cache import (
+    DEFAULT_BITMAP_MAX_SIZE,
+    DEFAULT_GLYPH_MAX,
+    AdaptiveCacheLimits,
+    get_rss,
+)
+from ass.renderer import ASS_Renderer
+
+
+class FakeRenderer:
+    enable_adaptive_cache = ASS_Renderer.enable_adaptive_cache
+
+    def __init__(self, cache_limits=None):
+        self.cache_limits = cache_limits
+
+    def ass_set_cache_limits(self, glyph_max, bitmap_max_size):
+        self.cache_limits = (glyph_max, bitmap_max_size)
+
+
+def run_window(limits, renderer, latency_ms):
+    for _ in range(limits.window):
+        limits.record(renderer, int(latency_ms * 1e6))
+
+
+def test_get_rss(monkeypatch):
+    rss = get_rss()
+    assert rss is None or rss > 0
+
+    def no_proc(*args, **kwargs):
+        raise OSError
+
+    monkeypatch.setattr(builtins, "open", no_proc)
+    assert get_rss() is None
+
+
+@pytest.mark.parametrize("platform", ["win32", "darwin"])
+def test_get_rss_unavailable_reader(monkeypatch, platform):
+    # The Windows and macOS functions are missing here
+    monkeypatch.setattr(cache, "_rss_reader", None)
+    monkeypatch.setattr(cache.sys, "platform", platform)
+
+    assert get_rss() is None
+    assert cache._rss_reader is cache._unknown_rss
+
+
+def test_memory_limit_warning(monkeypatch):
+    monkeypatch.setattr(cache, "get_rss", lambda: None)
+
+    with pytest.warns(RuntimeWarning):
+        AdaptiveCacheLimits(memory_limit=1000)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        AdaptiveCacheLimits()
+
+
+def test_initial_limits():
+    limits = AdaptiveCacheLimits()
+    assert limits.limits == (DEFAULT_GLYPH_MAX, DEFAULT_BITMAP_MAX_SIZE)
+
+    limits = AdaptiveCacheLimits(initial=(2000, 0))
+    assert limits.limits == (2000, DEFAULT_BITMAP_MAX_SIZE)
+
+    limits = AdaptiveCacheLimits(
+        glyph_bounds=(5000, 8000), bitmap_bounds=(16, 64), initial=(100, 512)
+    )
+    assert limits.limits == (5000, 64)
+
+
+def test_enable_adaptive_cache_keeps_configured_limits():
+    renderer = FakeRenderer(cache_limits=(2000, 32))
+
+    limits = renderer.enable_adaptive_cache()
+    assert limits.limits == renderer.cache_limits == (2000, 32)
+
+    renderer = FakeRenderer()
+    renderer.enable_adaptive_cache(initial=(3000, 64))
+    assert renderer.cache_limits == (3000, 64)
+
+
+def test_latency_and_idle(monkeypatch):
+    monkeypatch.setattr(cache, "get_rss", lambda: None)
+    renderer = FakeRenderer()
+    limits = AdaptiveCacheLimits(window=4, initial=(2000, 32), target_ms=20)
+
+    run_window(limits, renderer, 30)
+    assert renderer.cache_limits == limits.limits == (3000, 48)
+    run_window(limits, renderer, 10)
+    assert renderer.cache_limits == (3000, 48)
+    run_window(limits, renderer, 1)
+    assert renderer.cache_limits == (2000, 32)
+    assert [a.reason for a in limits.history] == ["latency", "idle"]
+    assert [a.frame for a in limits.history] == [4, 12]
+
+
+def test_memory_limit(monkeypatch):
+    rss = [1000]
+    monkeypatch.setattr(cache, "get_rss", lambda: rss[0])
+    renderer = FakeRenderer()
+    limits = AdaptiveCacheLimits(
+        window=2, initial=(3000, 48), memory_limit=950
+    )
+
+    run_window(limits, renderer, 30)
+    assert limits.limits == (2000, 32)
+    assert limits.history[-1].reason == "memory"
+
+    # Close to the budget, the caches do not grow
+    rss[0] = 900
+    run_window(limits, renderer, 30)
+    assert limits.limits == (2000, 32)
+
+    # Without a known resident set size, the budget is ignored
+    rss[0] = None
+    run_window(limits, renderer, 30)
+    assert limits.limits == (3000, 48)
+
+
+def test_invalid_factor():
+    with pytest.raises(ValueError):
+        AdaptiveCacheLimits(factor=1)
@@ -0,0 +1,189 @@
+import numpy
+import pytest
+
+from ass.arrays import image_array
+from ass.compose import blend, blend_yuv, color_to_yuv
+from ass.enums import (
+    YCBCR_BT601_TV,
+    YCBCR_BT709_PC,
+    YCBCR_BT709_TV,
+    YCBCR_DEFAULT,
+    YCBCR_NONE,
+)
+from ass.utils import LibassError
+
+RED = 0xFF000000
+GREEN = 0x00FF0000
+
+
+def blue_frame(height, width, channels=3):
+    frame = numpy.zeros((height, width, channels), dtype=numpy.uint8)
+    frame[..., 2] = 255
+    return frame
+
+
+def test_blend_rgb(make_images):
+    image = make_images(([[255, 128], [0, 64]], RED, 0, 0))
+    frame = blue_frame(2, 2)
+
+    assert blend(image, frame, "RGB") == 1
+    assert frame.tolist() == [
+        [[255, 0, 0], [128, 0, 127]],
+        [[0, 0, 255], [64, 0, 191]],
+    ]
+
+
+def test_blend_bgr(make_images):
+    image = make_images(([[255, 128]], RED, 0, 0))
+    frame = numpy.zeros((1, 2, 3), dtype=numpy.uint8)
+
+    blend(image, frame, "BGR")
+    assert frame.tolist() == [[[0, 0, 255], [0, 0, 128]]]
+
+
+def test_blend_color_opacity(make_images):
+    # Alpha 0x80 leaves an opacity of 127 out of 255
+    image = make_images(([[255]], RED | 0x80, 0, 0))
+    frame = blue_frame(1, 1)
+
+    blend(image, frame, "RGB")
+    assert frame.tolist() == [[[127, 0, 128]]]
+
+
+def test_blend_transparent_image(make_images):
+    image = make_images(([[255]], RED | 0xFF, 0, 0))
+    frame = blue_frame(1, 1)
+
+    assert blend(image, frame, "RGB") == 1
+    assert frame.tolist() == [[[0, 0, 255]]]
+
+
+def test_blend_order(make_images):
+    image = make_images(
+        ([[255, 255]], RED, 0, 0),
+        ([[0, 255]], GREEN, 0, 0),
+    )
+    frame = blue_frame(1, 2)
+
+    assert blend(image, frame, "RGB") == 2
+    assert frame.tolist() == [[[255, 0, 0], [0, 255, 0]]]
+
+
+def test_blend_clipping(make_images):
+    image = make_images(
+        ([[255, 255], [255, 255]], RED, -1, 1),
+        ([[255]], GREEN, 5, 0),
+    )
+    frame = blue_frame(2, 2)
+
+    assert blend(image, frame, "RGB") == 2
+    assert frame.tolist() == [
+        [[0, 0, 255], [0, 0, 255]],
+        [[255, 0, 0], [0, 0, 255]],
+    ]
+
+
+def test_blend_snapshot(make_images):
+    image = make_images(([[255, 128], [0, 64]], RED, 0, 0))
+    expected = blue_frame(2, 2)
+    blend(image, expected, "RGB")
+
+    frame = blue_frame(2, 2)
+    assert blend(image_array(image), frame, "RGB") == 1
+    numpy.testing.assert_array_equal(frame, expected)
+
+
+def test_blend_none():
+    frame = blue_frame(1, 1)
+    assert blend(None, frame) == 0
+    assert frame.tolist() == [[[0, 0, 255]]]
+
+
+def test_blend_invalid_frame():
+    with pytest.raises(LibassError):
+        blend(None, numpy.zeros((2, 2, 3)), "RGB")
+    with pytest.raises(LibassError):
+        blend(None, numpy.zeros((2, 2, 4), numpy.uint8), "RGB")
+    with pytest.raises(LibassError):
+        blend(None, numpy.zeros((2, 2, 3), numpy.uint8), "YUV")
+
+
+WHITE = 0xFFFFFF00
+
+
+def i420_planes(height, width):
+    return (
+        numpy.zeros((height, width), numpy.uint8),
+        numpy.zeros((height // 2, width // 2), numpy.uint8),
+        numpy.zeros((height // 2, width // 2), numpy.uint8),
+    )
+
+
+def test_color_to_yuv():
+    assert color_to_yuv(WHITE, YCBCR_BT601_TV) == pytest.approx(
+        (235, 128, 128)
+    )
+    assert color_to_yuv(WHITE, YCBCR_BT709_PC) == pytest.approx(
+        (255, 128, 128)
+    )
+    y, u, v = color_to_yuv(RED, YCBCR_BT601_TV)
+    assert y == pytest.approx(16 + 219 * 0.299)
+    assert v == pytest.approx(240)
+    assert color_to_yuv(RED, YCBCR_NONE, YCBCR_BT709_TV) == pytest.approx(
+        color_to_yuv(RED, YCBCR_BT709_TV)
+    )
+    assert color_to_yuv(RED, YCBCR_DEFAULT) == pytest.approx((y, u, v))
+
+
+def test_blend_yuv_i420(make_images):
+    image = make_images(([[255, 255], [255, 255]], WHITE, 0, 0))
+    planes = i420_planes(4, 4)
+
+    assert blend_yuv(image, planes, "I420") == 1
+    assert planes[0].tolist() == [
+        [235, 235, 0, 0],
+        [235, 235, 0, 0],
+        [0, 0, 0, 0],
+        [0, 0, 0, 0],
+    ]
+    assert planes[1].tolist() == [[128, 0], [0, 0]]
+    assert planes[2].tolist() == [[128, 0], [0, 0]]
+
+
+def test_blend_yuv_chroma_subsampling(make_images):
+    # The image covers a quarter of each 2x2 block of luma samples
+    image = make_images(([[255, 255]], WHITE, 1, 0))
+    planes = i420_planes(2, 4)
+
+    blend_yuv(image, planes, "I420")
+    assert planes[0].tolist() == [[0, 235, 235, 0], [0, 0, 0, 0]]
+    assert planes[1].tolist() == [[32, 32]]
+
+
+def test_blend_yuv_nv12(make_images):
+    image = make_images(([[255, 255], [255, 255]], WHITE, 0, 0))
+    luma = numpy.zeros((2, 2), numpy.uint8)
+    uv = numpy.zeros((1, 2), numpy.uint8)
+
+    blend_yuv(image, (luma, uv), "NV12")
+    assert luma.tolist() == [[235, 235], [235, 235]]
+    assert uv.tolist() == [[128, 128]]
+
+
+def test_blend_yuv_p010(make_images):
+    image = make_images(([[255, 255], [255, 255]], WHITE, 0, 0))
+    luma = numpy.zeros((2, 2), numpy.uint16)
+    uv = numpy.zeros((1, 1, 2), numpy.uint16)
+
+    blend_yuv(image, (luma, uv), "P010")
+    assert luma.tolist() == [[940 << 6] * 2] * 2
+    assert uv.tolist() == [[[512 << 6, 512 << 6]]]
+
+
+def test_blend_yuv_invalid_planes():
+    with pytest.raises(LibassError):
+        blend_yuv(None, i420_planes(2, 2)[:2], "I420")
+    with pytest.raises(LibassError):
+        blend_yuv(None, i420_planes(2, 2)[:2], "P010")
+    with pytest.raises(LibassError):
+        blend_yuv(None, i420_planes(2, 2), "YV12")
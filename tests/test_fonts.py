@@ -0,0 +1,140 @@
+import pytest
+
+from ass import libass
+from ass.fonts import FontRegistry, warmup
+from ass.library import ASS_Library
+from ass.utils import LibassError
+
+
+class FakeLibrary:
+    def __init__(self, fail=()):
+        self.fonts = []
+        self.fail = set(fail)
+
+    def ass_add_font(self, name, data):
+        if name in self.fail:
+            raise LibassError("Cannot add font")
+        self.fonts.append((name, bytes(data)))
+
+
+class ClearingLibrary(FakeLibrary):
+    library = None
+    ass_clear_fonts = ASS_Library.ass_clear_fonts
+
+
+def test_add_deduplicates():
+    registry = FontRegistry()
+
+    digest = registry.add("a.ttf", b"font")
+    assert registry.add("b.ttf", bytearray(b"font")) == digest
+    assert registry.add("c.ttf", b"other") != digest
+
+    stats = registry.stats()
+    assert stats["fonts"] == 2
+    assert stats["names"] == 3
+    assert stats["bytes"] == len(b"font") + len(b"other")
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+    assert registry.hit_rate == pytest.approx(1 / 3)
+
+
+def test_add_file_and_dir(tmp_path):
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "a.ttf").write_bytes(b"font")
+    (tmp_path / "sub" / "b.OTF").write_bytes(b"font")
+    (tmp_path / "empty.ttf").write_bytes(b"")
+    (tmp_path / "readme.txt").write_bytes(b"text")
+    registry = FontRegistry()
+
+    digests = registry.add_dir(str(tmp_path))
+    assert len(digests) == 3
+    assert registry.stats()["fonts"] == 2
+    assert registry.stats()["names"] == 3
+
+    # Unchanged files are not hashed again
+    assert registry.add_file(str(tmp_path / "a.ttf")) == digests[0]
+    assert registry.hits == 2
+
+
+def test_register_once_per_content():
+    registry = FontRegistry()
+    registry.add("a.ttf", b"font")
+    registry.add("b.ttf", b"font")
+    registry.add("c.ttf", b"other")
+    library = FakeLibrary()
+
+    registry.register(library, ["a.ttf", "b.ttf"])
+    registry.register(library)
+    registry.register(library)
+    assert library.fonts == [("a.ttf", b"font"), ("c.ttf", b"other")]
+
+    other = FakeLibrary()
+    registry.register(other, ["b.ttf"])
+    assert other.fonts == [("b.ttf", b"font")]
+
+
+def test_register_failure_is_retried():
+    registry = FontRegistry()
+    registry.add("a.ttf", b"font")
+    registry.add("b.ttf", b"other")
+    library = FakeLibrary(fail={"b.ttf"})
+
+    with pytest.raises(LibassError):
+        registry.register(library)
+    library.fail.clear()
+    registry.register(library)
+    assert library.fonts == [("a.ttf", b"font"), ("b.ttf", b"other")]
+
+
+def test_register_after_clear_fonts(monkeypatch):
+    monkeypatch.setattr(libass, "ass_clear_fonts", lambda library: None)
+    registry = FontRegistry()
+    other_registry = FontRegistry()
+    registry.add("a.ttf", b"font")
+    other_registry.add("b.ttf", b"other")
+    library = ClearingLibrary()
+
+    registry.register(library)
+    other_registry.register(library)
+    library.ass_clear_fonts()
+    library.fonts.clear()
+    registry.register(library)
+    other_registry.register(library)
+    assert library.fonts == [("a.ttf", b"font"), ("b.ttf", b"other")]
+
+
+def test_forget():
+    registry = FontRegistry()
+    registry.add("a.ttf", b"font")
+    library = FakeLibrary()
+
+    registry.forget(library)
+    registry.register(library)
+    registry.forget(library)
+    registry.register(library)
+    assert library.fonts == [("a.ttf", b"font")] * 2
+
+
+def test_register_unknown_font():
+    registry = FontRegistry()
+    registry.add("a.ttf", b"font")
+    library = FakeLibrary()
+
+    with pytest.raises(LibassError):
+        registry.register(library, ["a.ttf", "missing.ttf"])
+    assert library.fonts == []
+
+
+def test_warmup(fake_config):
+    config = fake_config((1, 1))
+
+    renderer = warmup("library", config).result(timeout=5)
+    assert renderer is config.created[0]
+
+
+def test_warmup_error(fake_config):
+    config = fake_config((1, 1))
+    config.create = lambda ass_library: 1 / 0
+
+    with pytest.raises(ZeroDivisionError):
+        warmup("library", config).result(timeout=5)
@@ -0,0 +1,23 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Import ass in a fresh interpreter and report what got loaded
+IMPORT_SCRIPT = """
+import sys
+import ass
+print("numpy" in sys.modules, ass.libass._lib is not None)
+"""
+
+
+def test_import_is_lazy():
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        p for p in (ROOT, env.get("PYTHONPATH")) if p
+    )
+    output = subprocess.check_output(
+        [sys.executable, "-c", IMPORT_SCRIPT], env=env, cwd=ROOT
+    ).split()
+    assert output == [b"False", b"False"]
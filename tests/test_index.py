@@ -0,0 +1,119 @@
+import numpy
+import pytest
+
+from ass.index import EventIndex, is_dynamic
+
+STARTS = [0, 500, 100, 1000, 1000]
+DURATIONS = [1000, 100, 2000, 0, 500]
+
+
+def brute_active(starts, durations, t0, t1):
+    return [
+        i
+        for i, (start, duration) in enumerate(zip(starts, durations))
+        if start < t1 and start + max(duration, 0) > t0
+    ]
+
+
+def test_active_at():
+    index = EventIndex(STARTS, DURATIONS)
+
+    assert len(index) == 5
+    assert index.active_at(-1).tolist() == []
+    assert index.active_at(0).tolist() == [0]
+    assert index.active_at(550).tolist() == [0, 1, 2]
+    assert index.active_at(600).tolist() == [0, 2]
+    # An event ends right before Start + Duration, zero durations never show
+    assert index.active_at(1000).tolist() == [2, 4]
+    assert index.active_at(2100).tolist() == []
+
+
+def test_count_at_and_is_empty():
+    index = EventIndex(STARTS, DURATIONS)
+
+    for t in (-1, 0, 550, 600, 1000, 1499, 1500, 2100):
+        assert index.count_at(t) == len(index.active_at(t))
+        assert index.is_empty(t) == (not len(index.active_at(t)))
+
+
+def test_active_in():
+    index = EventIndex(STARTS, DURATIONS)
+
+    assert index.active_in(550, 1000).tolist() == [0, 1, 2]
+    assert index.active_in(1000, 1001).tolist() == [2, 4]
+    assert index.active_in(2100, 3000).tolist() == []
+
+
+def test_random_queries():
+    rng = numpy.random.default_rng(0)
+    starts = rng.integers(0, 10000, 200)
+    durations = rng.integers(-10, 1000, 200)
+    index = EventIndex(starts, durations)
+
+    for t0 in rng.integers(-100, 11000, 50).tolist():
+        t1 = t0 + int(rng.integers(1, 500))
+        assert index.active_at(t0).tolist() == brute_active(
+            starts, durations, t0, t0 + 1
+        )
+        assert index.active_in(t0, t1).tolist() == brute_active(
+            starts, durations, t0, t1
+        )
+
+
+def test_empty_index():
+    index = EventIndex([], [])
+
+    assert len(index) == 0
+    assert index.active_at(0).tolist() == []
+    assert index.is_empty(0)
+
+
+@pytest.mark.parametrize(
+    "text,expected",
+    [
+        (b"plain text", False),
+        (b"{\\b1}bold", False),
+        (b"{\\fad(100,200)}fade", True),
+        (b"{\\move(0,0,10,10)}move", True),
+        (b"{\\t(\\frz90)}spin", True),
+        (b"{\\k20}ka{\\kf30}ra", True),
+        (b"{\\kt20}x", False),
+    ],
+)
+def test_is_dynamic(text, expected):
+    assert is_dynamic(text) == expected
+
+
+def test_change_points():
+    index = EventIndex(STARTS, DURATIONS, [False, True, False, False, True])
+
+    points = index.change_points(0, 2000)
+    assert points.times.tolist() == [0, 100, 500, 600, 1000, 1500]
+    assert points.dynamic == [(500, 600), (1000, 1500)]
+
+
+def test_change_points_clipped():
+    index = EventIndex([0, 50, 100], [100, 100, 100], [True, True, False])
+
+    points = index.change_points(60, 120)
+    assert points.times.tolist() == [60, 100]
+    # Overlapping dynamic ranges are merged and clipped to the range
+    assert points.dynamic == [(60, 120)]
+
+
+def test_change_points_states():
+    rng = numpy.random.default_rng(1)
+    starts = rng.integers(0, 1000, 30)
+    durations = rng.integers(1, 200, 30)
+    index = EventIndex(starts, durations)
+
+    times = index.change_points(100, 900).times.tolist()
+    bounds = times + [900]
+    for start, end in zip(bounds, bounds[1:]):
+        state = index.active_at(start).tolist()
+        for t in range(start, end):
+            assert index.active_at(t).tolist() == state
+    for previous, t in zip(times, times[1:]):
+        assert (
+            index.active_at(previous).tolist() != index.active_at(t).tolist()
+        )
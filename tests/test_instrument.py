@@ -0,0 +1,124 @@
+import types
+
+import pytest
+
+from ass import instrument, libass
+
+NAMES = ("ass_library_version", "ass_step_sub")
+
+
+@pytest.fixture
+def functions(monkeypatch):
+    """Fake libass functions, taking as argument the number of nanoseconds
+    they last on a fake clock.
+    """
+    now = [0]
+
+    def make_function(name):
+        def func(elapsed=0):
+            now[0] += elapsed
+            return name
+
+        func.__name__ = name
+        return func
+
+    functions = {name: make_function(name) for name in NAMES}
+
+    def get_function(name, backend=None):
+        if name not in functions:
+            raise AttributeError(name)
+        return functions[name]
+
+    monkeypatch.setattr(libass, "_prototypes", {})
+    for name in NAMES + ("ass_missing",):
+        monkeypatch.setattr(
+            libass, name, libass._LazyFunction(name), raising=False
+        )
+    monkeypatch.setattr(libass, "get_function", get_function)
+    monkeypatch.setattr(
+        instrument,
+        "time",
+        types.SimpleNamespace(perf_counter_ns=lambda: now[0]),
+    )
+    monkeypatch.setattr(instrument, "_originals", {})
+    monkeypatch.setattr(instrument, "_stats", {})
+    return functions
+
+
+def test_enable_all(functions):
+    instrument.enable()
+    assert instrument.is_enabled()
+    assert libass.ass_library_version() == "ass_library_version"
+    assert libass.ass_library_version.__wrapped__ is functions[NAMES[0]]
+    assert isinstance(libass.ass_missing, libass._LazyFunction)
+
+    with pytest.raises(AttributeError):
+        instrument.enable(["ass_missing"])
+
+
+def test_sample_every(functions):
+    with pytest.raises(ValueError):
+        instrument.enable(sample_every=0)
+
+    instrument.enable(["ass_step_sub"], sample_every=3)
+    for _ in range(7):
+        libass.ass_step_sub(10)
+
+    stats = instrument.snapshot()
+    assert list(stats) == ["ass_step_sub"]
+    assert stats["ass_step_sub"]["calls"] == 7
+    assert stats["ass_step_sub"]["timed"] == 2
+    assert stats["ass_step_sub"]["total_ns"] == 20
+
+
+def test_histogram(functions):
+    instrument.enable(["ass_step_sub"])
+    for elapsed in (0, 1, 1000, 1000, 1 << 50):
+        libass.ass_step_sub(elapsed)
+
+    stats = instrument.snapshot()["ass_step_sub"]
+    assert stats["histogram"] == {
+        1: 1,
+        2: 1,
+        1024: 2,
+        1 << (instrument.HISTOGRAM_BUCKETS - 1): 1,
+    }
+    assert stats["max_ns"] == 1 << 50
+    assert stats["mean_ns"] == pytest.approx((2001 + (1 << 50)) / 5)
+
+    instrument.reset()
+    assert instrument.snapshot() == {}
+
+
+def test_disable_restores_functions(functions):
+    instrument.enable()
+    libass.ass_step_sub(5)
+    instrument.disable()
+
+    assert not instrument.is_enabled()
+    for name in NAMES:
+        assert getattr(libass, name) is functions[name]
+    # Statistics are kept until reset()
+    assert instrument.snapshot()["ass_step_sub"]["calls"] == 1
+
+
+def test_profile(functions):
+    with instrument.profile(["ass_step_sub"]) as profile:
+        libass.ass_step_sub(5)
+    assert profile.stats["ass_step_sub"]["total_ns"] == 5
+    assert not instrument.is_enabled()
+    assert libass.ass_step_sub is functions["ass_step_sub"]
+
+
+def test_profile_keeps_enabled(functions):
+    instrument.enable(["ass_step_sub"])
+    libass.ass_step_sub(5)
+    wrapper = libass.ass_step_sub
+
+    with instrument.profile(["ass_step_sub"]) as profile:
+        libass.ass_step_sub(7)
+    # Statistics collected before the block are reset
+    assert profile.stats["ass_step_sub"]["calls"] == 1
+    assert profile.stats["ass_step_sub"]["total_ns"] == 7
+    assert instrument.is_enabled()
+    assert libass.ass_step_sub is wrapper
@@ -0,0 +1,66 @@
+import ctypes
+import sys
+
+import pytest
+
+from ass import libass
+
+
+class FakeLibrary:
+    def __init__(self):
+        self.ass_library_version = ctypes.CFUNCTYPE(ctypes.c_int)(lambda: 42)
+
+
+@pytest.fixture
+def no_cffi(monkeypatch):
+    monkeypatch.setattr(libass, "load_library", FakeLibrary)
+    # A None entry makes the import of the module fail
+    monkeypatch.setitem(sys.modules, "ass._cffi_calls", None)
+    monkeypatch.setattr(libass, "BACKEND", "cffi")
+
+
+def test_cffi_fallback(no_cffi, monkeypatch):
+    monkeypatch.setattr(libass, "_BACKEND_REQUESTED", False)
+
+    func = libass.get_function("ass_library_version")
+    assert func() == 42
+    assert libass.BACKEND == "ctypes"
+
+
+def test_cffi_requested(no_cffi, monkeypatch):
+    monkeypatch.setattr(libass, "_BACKEND_REQUESTED", True)
+
+    with pytest.raises(ImportError):
+        libass.get_function("ass_library_version")
+    assert libass.BACKEND == "cffi"
+
+
+def test_cffi_argument(no_cffi, monkeypatch):
+    monkeypatch.setattr(libass, "_BACKEND_REQUESTED", False)
+
+    with pytest.raises(ImportError):
+        libass.get_function("ass_library_version", backend="cffi")
+    assert libass.get_function("ass_library_version", "ctypes")() == 42
+
+
+def test_set_library_path(monkeypatch):
+    loaded = []
+
+    def get_library(name, library_path, **kwargs):
+        loaded.append(library_path)
+        return FakeLibrary()
+
+    monkeypatch.setattr(libass, "_lib", None)
+    monkeypatch.setattr(libass, "_prototypes", {})
+    monkeypatch.setattr(libass, "library_path", None)
+    monkeypatch.setattr(libass, "get_library", get_library)
+
+    libass.set_library_path("/opt/libass.so")
+    libass.load_library()
+    assert loaded == ["/opt/libass.so"]
+
+    with pytest.raises(OSError):
+        libass.set_library_path("/usr/lib/libass.so")
+    assert libass.library_path == "/opt/libass.so"
+    libass.load_library()
+    assert len(loaded) == 1
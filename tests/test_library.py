@@ -0,0 +1,96 @@
+import ctypes
+import mmap
+
+import numpy
+import pytest
+
+from ass import libass
+from ass.library import ASS_Library
+from ass.utils import LibassError
+
+
+@pytest.fixture
+def library(monkeypatch):
+    """ASS_Library whose libass track calls are faked; ass_read_memory
+    records the data libass would parse.
+    """
+    reads = []
+
+    def read_memory(ass_library, pointer, size, codepage):
+        reads.append((ctypes.string_at(pointer, size), codepage))
+        return ctypes.pointer(libass.ASS_Track()) if size else None
+
+    monkeypatch.setattr(libass, "ass_read_memory", read_memory)
+    monkeypatch.setattr(
+        libass, "ass_new_track", lambda _: ctypes.pointer(libass.ASS_Track())
+    )
+    monkeypatch.setattr(libass, "ass_free_track", lambda track: None)
+
+    ass_library = ASS_Library.__new__(ASS_Library)
+    ass_library.library = None
+    ass_library.reads = reads
+    return ass_library
+
+
+DATA = b"[Script Info]\nScriptType: v4.00+\n"
+
+
+@pytest.mark.parametrize(
+    "buf",
+    [
+        DATA,
+        DATA.decode(),
+        bytearray(DATA),
+        memoryview(DATA),
+        numpy.frombuffer(DATA, numpy.uint8),
+    ],
+)
+def test_read_memory(library, buf):
+    track = library.ass_read_memory(buf, "UTF-8")
+
+    assert library.reads == [(DATA, b"UTF-8")]
+    assert track.track
+    track.track = None
+
+
+def test_read_memory_non_contiguous(library):
+    with pytest.raises(LibassError):
+        library.ass_read_memory(memoryview(DATA)[::2], "UTF-8")
+    assert not library.reads
+
+
+def test_read_memory_failure(library):
+    with pytest.raises(LibassError):
+        library.ass_read_memory(b"", None)
+
+
+def test_read_memory_releases_mmap(library, tmp_path):
+    path = tmp_path / "sub.ass"
+    path.write_bytes(DATA)
+
+    with open(str(path), "rb") as f:
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    track = library.ass_read_memory(buf, "UTF-8")
+    # Raises BufferError if the buffer is still exported
+    buf.close()
+
+    assert library.reads == [(DATA, b"UTF-8")]
+    track.track = None
+
+
+def test_read_mmap(library, tmp_path):
+    path = tmp_path / "sub.ass"
+    path.write_bytes(DATA)
+
+    track = library.ass_read_mmap(str(path), "UTF-8")
+    assert library.reads == [(DATA, b"UTF-8")]
+    track.track = None
+
+
+def test_read_mmap_empty_file(library, tmp_path):
+    path = tmp_path / "empty.ass"
+    path.write_bytes(b"")
+
+    with pytest.raises(LibassError):
+        library.ass_read_mmap(str(path), "UTF-8")
+    assert library.reads == [(b"", b"UTF-8")]
@@ -0,0 +1,70 @@
+import ctypes
+
+from ass.messages import LEVELS, MESSAGE_SIZE, Message, MessageCollector
+
+# Stands for a va_list; the formats below have no conversion, so it is never
+# read from
+VA_LIST = ctypes.create_string_buffer(64)
+
+
+def emit(collector, level, text):
+    collector.callback(level, text, ctypes.addressof(VA_LIST), None)
+
+
+def test_level_filter():
+    collector = MessageCollector(level=4)
+
+    emit(collector, 1, b"error")
+    emit(collector, 6, b"verbose")
+    emit(collector, 4, b"info\n")
+
+    assert len(collector) == 2
+    assert collector.drain() == [Message(1, "error"), Message(4, "info")]
+    assert len(collector) == 0
+    stats = collector.stats()
+    assert [stats[level] for level in range(LEVELS)] == [
+        0,
+        1,
+        0,
+        0,
+        1,
+        0,
+        1,
+        0,
+    ]
+    assert stats["dropped"] == 0
+
+
+def test_capacity():
+    collector = MessageCollector(capacity=2)
+
+    for i in range(5):
+        emit(collector, 1, b"message %d" % i)
+
+    assert collector.stats()["dropped"] == 3
+    assert collector.drain(1) == [Message(1, "message 3")]
+    assert collector.drain(10) == [Message(1, "message 4")]
+
+
+def test_truncation_and_decoding():
+    collector = MessageCollector()
+
+    emit(collector, 1, b"x" * (2 * MESSAGE_SIZE))
+    emit(collector, 1, b"caf\xe9")
+
+    long_message, invalid = collector.drain()
+    assert long_message.text == "x" * (MESSAGE_SIZE - 1)
+    assert invalid.text == "caf\ufffd"
+
+
+def test_reset():
+    collector = MessageCollector()
+    emit(collector, 1, b"error")
+    emit(collector, 9, b"unknown level")
+
+    assert collector.stats()[LEVELS - 1] == 1
+    collector.reset()
+    assert len(collector) == 0
+    expected = dict.fromkeys(range(LEVELS), 0)
+    expected["dropped"] = 0
+    assert collector.stats() == expected
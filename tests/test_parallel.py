@@ -0,0 +1,90 @@
+import pytest
+
+from ass import parallel
+from ass.utils import LibassError
+
+
+class FakeLibrary:
+    def ass_read_memory(self, data, codepage):
+        return data
+
+
+def test_default_compose(monkeypatch, make_images, fake_config):
+    monkeypatch.setattr(parallel, "ASS_Library", FakeLibrary)
+    monkeypatch.setattr(parallel, "_worker", None)
+    image = make_images(([[255]], 0xFF000000, 2, 1))
+    config = fake_config((3, 2), image)
+
+    parallel._init_worker(None, "track", None, None, config, None)
+    empty, frame = parallel._render_chunk([-1, 0])
+
+    assert empty.shape == frame.shape == (2, 3, 4)
+    assert not empty.any()
+    assert frame[1, 2].tolist() == [255, 0, 0, 255]
+    assert frame.sum() == 255 * 2
+    assert config.created[0].rendered == [("track", -1), ("track", 0)]
+
+
+class FakeFuture:
+    def __init__(self, executor, chunk):
+        self.executor = executor
+        self.chunk = chunk
+
+    def result(self):
+        self.executor.in_flight -= 1
+        return [t * 10 for t in self.chunk]
+
+
+class FakeExecutor:
+    """Runs nothing, records the submitted chunks and how many are pending."""
+
+    def __init__(self, processes, initializer, initargs):
+        self.initargs = initargs
+        self.chunks = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.closed = False
+
+    def submit(self, func, chunk):
+        assert func is parallel._render_chunk
+        self.chunks.append(chunk)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        return FakeFuture(self, chunk)
+
+    def shutdown(self):
+        self.closed = True
+
+
+def test_map(monkeypatch):
+    monkeypatch.setattr(parallel, "ProcessPoolExecutor", FakeExecutor)
+    timestamps = list(range(0, 1000, 7))
+
+    with parallel.RenderFarm(
+        "config", data="track", processes=2, chunks_per_process=8
+    ) as farm:
+        results = list(farm.map(iter(timestamps)))
+        executor = farm._executor
+
+    assert results == [t * 10 for t in timestamps]
+    assert executor.closed
+    # Contiguous chunks covering the timestamps once, in order
+    assert [t for chunk in executor.chunks for t in chunk] == timestamps
+    assert len(executor.chunks) == 16
+    assert executor.max_in_flight == 2 * farm.processes + 1
+    assert executor.in_flight == 0
+
+
+def test_map_empty(monkeypatch):
+    monkeypatch.setattr(parallel, "ProcessPoolExecutor", FakeExecutor)
+
+    with parallel.RenderFarm("config", data="track", processes=2) as farm:
+        assert list(farm.map([])) == []
+        assert farm._executor.chunks == []
+
+
+def test_source_required():
+    with pytest.raises(LibassError):
+        parallel.RenderFarm("config")
+    with pytest.raises(LibassError):
+        parallel.RenderFarm("config", filename="a.ass", data="track")
@@ -0,0 +1,123 @@
+import threading
+
+from ass.pool import KeyedRendererPool, RendererPool
+
+RED = 0xFF000000
+
+
+def test_renderer_pool_default_compose(make_images, fake_config, fake_track):
+    image = make_images(([[255, 128]], RED | 0x80, 0, 0))
+    config = fake_config((2, 1), image)
+    track = fake_track()
+
+    with RendererPool(None, config, max_workers=2) as pool:
+        frame = pool.submit(track, 0).result()
+        empty = pool.submit(track, -1).result()
+
+    assert frame.tolist() == [[[255, 0, 0, 127], [255, 0, 0, 64]]]
+    assert empty.shape == (1, 2, 4)
+    assert not empty.any()
+
+
+def test_renderer_pool_one_renderer_per_thread(fake_config, fake_track):
+    config = fake_config((2, 2))
+    track = fake_track()
+    barrier = threading.Barrier(2)
+
+    def compose(image):
+        barrier.wait(timeout=5)
+        return threading.get_ident()
+
+    with RendererPool(None, config, max_workers=2) as pool:
+        futures = [pool.submit(track, now, compose) for now in (0, 1)]
+        threads = {future.result() for future in futures}
+
+    assert len(threads) == 2
+    assert len(config.created) == 2
+    assert all(len(renderer.rendered) == 1 for renderer in config.created)
+
+
+def test_renderer_pool_serializes_renders_of_a_track(fake_config, fake_track):
+    config = fake_config((1, 1))
+    tracks = [fake_track(name) for name in ("a", "b")]
+    barrier = threading.Barrier(4)
+
+    def compose(image):
+        # Every thread holds its frame here, so compose calls are concurrent
+        barrier.wait(timeout=5)
+
+    with RendererPool(None, config, max_workers=4) as pool:
+        futures = [
+            pool.submit(track, now, compose)
+            for now in range(4)
+            for track in tracks
+        ]
+        for future in futures:
+            future.result()
+
+    assert len(config.created) == 4
+    assert [track.overlaps for track in tracks] == [0, 0]
+    rendered = [item for r in config.created for item in r.rendered]
+    assert sorted(rendered, key=repr) == sorted(
+        ((track, now) for now in range(4) for track in tracks), key=repr
+    )
+
+
+def test_keyed_pool_reuse(fake_config):
+    pool = KeyedRendererPool(None, max_size=4)
+    config = fake_config((1, 1))
+
+    with pool.renderer(config) as first:
+        pass
+    with pool.renderer(config) as second:
+        assert len(pool) == 0
+    assert second is first
+    assert len(pool) == 1
+    assert pool.stats() == {
+        "hits": 1,
+        "misses": 1,
+        "evictions": 0,
+        "idle": 1,
+        "configs": 1,
+    }
+
+
+def test_keyed_pool_eviction_after_checkout(fake_config):
+    pool = KeyedRendererPool(None, max_size=1)
+    config_a, config_b = fake_config((1, 1)), fake_config((2, 2))
+
+    pool.checkin(config_a, "a")
+    assert pool.checkout(config_a) == "a"
+    pool.checkin(config_b, "b1")
+    pool.checkin(config_b, "b2")
+
+    assert len(pool) == 1
+    assert pool.evictions == 1
+    assert pool.stats()["configs"] == 1
+    assert pool.checkout(config_b) == "b2"
+
+
+def test_keyed_pool_lru(fake_config):
+    pool = KeyedRendererPool(None, max_size=2)
+    configs = [fake_config((size, size)) for size in (1, 2, 3)]
+
+    pool.checkin(configs[0], "a")
+    pool.checkin(configs[1], "b")
+    # Checking out and in makes the first configuration the most recent
+    pool.checkin(configs[0], pool.checkout(configs[0]))
+    pool.checkin(configs[2], "c")
+
+    assert pool.evictions == 1
+    assert pool.checkout(configs[0]) == "a"
+    assert pool.checkout(configs[2]) == "c"
+    assert pool.checkout(configs[1]) is configs[1].created[0]
+
+
+def test_keyed_pool_clear(fake_config):
+    pool = KeyedRendererPool(None)
+    config = fake_config((1, 1))
+    pool.checkin(config, "a")
+
+    pool.clear()
+    assert len(pool) == 0
+    assert pool.checkout(config) is config.created[0]
@@ -0,0 +1,87 @@
+import asyncio
+import threading
+import time
+
+from ass.compose import to_rgba
+
+
+def test_render_frame_async(make_images, fake_config, fake_track):
+    image = make_images(([[255]], 0xFF000000, 0, 0))
+    renderer = fake_config((1, 1), image).create(None)
+
+    async def render():
+        return await renderer.render_frame_async(
+            fake_track(), 0, lambda image: to_rgba(image, 1, 1)
+        )
+
+    assert asyncio.run(render()).tolist() == [[[255, 0, 0, 255]]]
+
+
+def test_render_frame_async_serialized(fake_config, fake_track):
+    renderer = fake_config((1, 1)).create(None)
+    track = fake_track()
+    lock = threading.Lock()
+    overlaps = []
+
+    def compose(image):
+        if not lock.acquire(blocking=False):
+            overlaps.append(image)
+            return
+        time.sleep(0.01)
+        lock.release()
+
+    async def render():
+        await asyncio.gather(
+            *(renderer.render_frame_async(track, t, compose) for t in range(4))
+        )
+
+    asyncio.run(render())
+    assert not overlaps
+    assert [now for _, now in renderer.rendered] == [0, 1, 2, 3]
+
+
+def test_render_frame_async_shared_track(fake_config, fake_track):
+    config = fake_config((1, 1))
+    renderers = [config.create(None) for _ in range(4)]
+    shared, other = fake_track("shared"), fake_track("other")
+    barrier = threading.Barrier(4)
+
+    def compose(image):
+        # Compose calls of all the renderers run at the same time
+        barrier.wait(timeout=5)
+
+    async def render():
+        await asyncio.gather(
+            *(
+                renderer.render_frame_async(track, 0, compose)
+                for renderer, track in zip(
+                    renderers, (shared, shared, shared, other)
+                )
+            )
+        )
+
+    asyncio.run(render())
+    assert shared.overlaps == other.overlaps == 0
+    assert all(len(renderer.rendered) == 1 for renderer in renderers)
+
+
+def test_render_many_reuses_unchanged_frames(fake_config):
+    renderer = fake_config((1, 1)).create(None)
+    changes = iter([0, 0, 2, 0, 1])
+    renderer._render_frame = lambda track, now: (now, next(changes))
+    composed = []
+
+    def compose(image):
+        composed.append(image)
+        return "frame {}".format(image)
+
+    results = list(renderer.render_many("track", range(5), compose))
+
+    assert results == ["frame 0", "frame 0", "frame 2", "frame 2", "frame 4"]
+    assert composed == [0, 2, 4]
+
+
+def test_render_many_without_compose(fake_config):
+    renderer = fake_config((1, 1), "image").create(None)
+
+    assert list(renderer.render_many("track", [-1, 0])) == [None, "image"]
@@ -0,0 +1,90 @@
+import pytest
+
+from ass.telemetry import RenderTelemetry
+
+
+def test_record(make_images):
+    telemetry = RenderTelemetry(capacity=4)
+    image = make_images(
+        ([[255] * 3] * 2, 0, 0, 0),
+        ([[255] * 5], 0, 0, 0),
+    )
+
+    telemetry.record(0, 1000, image, 2)
+    telemetry.record(40, 2000, None, 0)
+    telemetry.record(80, 3000, None, 2)
+
+    frames = telemetry.frames()
+    assert frames["now"].tolist() == [0, 40, 80]
+    assert frames["wall_ns"].tolist() == [1000, 2000, 3000]
+    # The unchanged frame keeps the images of the previous one
+    assert frames["images"].tolist() == [2, 2, 0]
+    assert frames["area"].tolist() == [11, 11, 0]
+    assert frames["detect_change"].tolist() == [2, 0, 2]
+    assert len(telemetry) == telemetry.count == 3
+
+
+def test_ring_buffer():
+    telemetry = RenderTelemetry(capacity=3)
+
+    for now in range(3):
+        telemetry.record(now, now, None, 1)
+    assert telemetry.frames()["now"].tolist() == [0, 1, 2]
+
+    for now in range(3, 7):
+        telemetry.record(now, now, None, 1)
+    assert telemetry.frames()["now"].tolist() == [4, 5, 6]
+    assert len(telemetry) == 3
+    assert telemetry.count == 7
+
+
+def test_exporter():
+    batches = []
+    telemetry = RenderTelemetry(capacity=3, exporter=batches.append)
+
+    for now in range(7):
+        telemetry.record(now, now, None, 1)
+    assert [batch["now"].tolist() for batch in batches] == [
+        [0, 1, 2],
+        [3, 4, 5],
+    ]
+
+    telemetry.flush()
+    telemetry.flush()
+    assert batches[-1]["now"].tolist() == [6]
+    assert len(batches) == 3
+
+
+def test_clear():
+    batches = []
+    telemetry = RenderTelemetry(capacity=3, exporter=batches.append)
+    telemetry.record(0, 0, None, 1)
+
+    telemetry.clear()
+    telemetry.flush()
+    assert not batches
+    assert len(telemetry) == 0
+    assert len(telemetry.frames()) == 0
+
+
+def test_summary():
+    telemetry = RenderTelemetry(capacity=8)
+    assert telemetry.summary() == {
+        "frames": 0,
+        "changed": 0.0,
+        "wall_ms": {},
+        "images": {},
+        "area": {},
+    }
+
+    for now, wall_ns, change in ((0, 1e6, 1), (1, 3e6, 0)):
+        telemetry.record(now, wall_ns, None, change)
+    summary = telemetry.summary(percentiles=(50,))
+    assert summary["frames"] == 2
+    assert summary["changed"] == 0.5
+    assert summary["wall_ms"] == {"p50": 2.0, "max": 3.0}
+
+
+def test_invalid_capacity():
+    with pytest.raises(ValueError):
+        RenderTelemetry(capacity=0)
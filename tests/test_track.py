@@ -0,0 +1,347 @@
+import asyncio
+import ctypes
+import time
+
+import pytest
+
+from ass import libass
+from ass.track import ASS_Track
+from ass.utils import LibassError
+
+
+@pytest.fixture
+def make_track():
+    """Build an ASS_Track over ctypes structs instead of a libass track.
+
+    Events are (start, duration, style, text) tuples; the track has room for
+    more events, appended by the fake ass_process_data.
+    """
+    tracks = []
+
+    def factory(style_names=(b"Default",), events=(), capacity=16):
+        styles = (libass.ASS_Style * len(style_names))()
+        for style, name in zip(styles, style_names):
+            style.Name = name
+        event_structs = (libass.ASS_Event * capacity)()
+        for event, (start, duration, sid, text) in zip(event_structs, events):
+            event.Start = start
+            event.Duration = duration
+            event.Style = sid
+            event.Text = text
+        data = libass.ASS_Track(
+            n_styles=len(style_names),
+            max_styles=len(style_names),
+            n_events=len(events),
+            max_events=capacity,
+            styles=ctypes.cast(styles, ctypes.POINTER(libass.ASS_Style)),
+            events=ctypes.cast(
+                event_structs, ctypes.POINTER(libass.ASS_Event)
+            ),
+        )
+        track = ASS_Track.__new__(ASS_Track)
+        track._event_index = None
+        track.track = ctypes.pointer(data)
+        track._structs = (styles, event_structs)
+        tracks.append(track)
+        return track
+
+    yield factory
+    for track in tracks:
+        track.track = None
+
+
+def test_events_array(make_track):
+    track = make_track(events=[(0, 100, 0, b"a"), (50, 200, 0, b"b")])
+
+    events = track.events_array
+    assert events["Start"].tolist() == [0, 50]
+    assert events["Duration"].tolist() == [100, 200]
+    assert ctypes.string_at(int(events["Text"][1])) == b"b"
+
+    events["Start"][1] = 75
+    assert track.track[0].events[1].Start == 75
+
+
+def test_styles_array(make_track):
+    track = make_track(style_names=(b"Default", b"Sign"))
+
+    styles = track.styles_array
+    assert len(styles) == 2
+    assert ctypes.string_at(int(styles["Name"][1])) == b"Sign"
+
+
+def test_empty_events_array(make_track):
+    assert len(make_track().events_array) == 0
+
+
+def test_retime_offset_scale(make_track):
+    track = make_track(events=[(1000, 500, 0, b"a"), (2000, 0, 0, b"b")])
+    track.event_index
+
+    track.retime(offset=-100, scale=0.5)
+    events = track.events_array
+    assert events["Start"].tolist() == [400, 900]
+    assert events["Duration"].tolist() == [250, 0]
+    assert track._event_index is None
+
+
+def test_retime_timecodes(make_track):
+    track = make_track(
+        events=[(-100, 100, 0, b""), (500, 1000, 0, b""), (3000, 10, 0, b"")]
+    )
+
+    # Doubles the times between 0 and 2000, shifts them outside
+    track.retime(timecodes=([0, 2000], [0, 4000]))
+    events = track.events_array
+    assert events["Start"].tolist() == [-100, 1000, 5000]
+    assert events["Duration"].tolist() == [100, 2000, 10]
+
+
+def test_retime_invalid_timecodes(make_track):
+    track = make_track(events=[(0, 100, 0, b"")])
+
+    with pytest.raises(LibassError):
+        track.retime(timecodes=([0, 1000], [0]))
+    with pytest.raises(LibassError):
+        track.retime(timecodes=([], []))
+
+
+def test_track_event_index(make_track):
+    track = make_track(
+        events=[
+            (0, 1000, 0, b"{\\fad(100,100)}a"),
+            (500, 1000, 0, b"b"),
+            (2000, 100, 0, None),
+        ]
+    )
+
+    assert track.active_at(600).tolist() == [0, 1]
+    assert track.active_in(1200, 2100).tolist() == [1, 2]
+    assert track.is_empty(1700)
+    points = track.change_points(0, 3000)
+    assert points.times.tolist() == [0, 500, 1000, 1500, 2000, 2100]
+    assert points.dynamic == [(0, 1000)]
+
+    track.events_array["Start"][2] = 1650
+    assert track.is_empty(1700)
+    track.invalidate_index()
+    assert not track.is_empty(1700)
+
+
+@pytest.fixture
+def process_data(monkeypatch):
+    """Replace ass_process_data with a parser of Format and Dialogue lines."""
+    calls = []
+    keep = []
+
+    def fake(track_pointer, data, size):
+        calls.append(data)
+        track = track_pointer[0]
+        styles = [track.styles[i].Name for i in range(track.n_styles)]
+        for line in data.splitlines():
+            if line.startswith(b"Format: "):
+                keep.append(ctypes.c_char_p(line[8:]))
+                track.event_format = keep[-1].value
+            if not line.startswith(b"Dialogue: "):
+                continue
+            fields = line[10:].split(b",", 9)
+            event = track.events[track.n_events]
+            event.Layer = int(fields[0])
+            event.Style = styles.index(fields[3])
+            event.Name = fields[4]
+            event.Effect = fields[8]
+            event.Text = fields[9]
+            keep.append(fields)
+            track.n_events += 1
+
+    monkeypatch.setattr(libass, "ass_process_data", fake)
+    return calls
+
+
+def test_add_events(make_track, process_data):
+    track = make_track(
+        style_names=(b"Default", b"Sign"), events=[(0, 10, 0, b"old")]
+    )
+
+    ids = track.add_events(
+        [100, 200],
+        [50, 60],
+        ["Sign", b"Default"],
+        ["first", b"second, with a comma"],
+        layers=[1, 2],
+        names=["actor", b""],
+    )
+
+    assert ids.tolist() == [1, 2]
+    events = track.events_array
+    assert events["Start"].tolist() == [0, 100, 200]
+    assert events["Duration"].tolist() == [10, 50, 60]
+    assert events["ReadOrder"].tolist()[1:] == [1, 2]
+    assert events["Style"].tolist() == [0, 1, 0]
+    assert events["Layer"].tolist()[1:] == [1, 2]
+    assert track.track[0].events[1].Name == b"actor"
+    assert track.track[0].events[2].Text == b"second, with a comma"
+
+
+def test_add_events_style_ids(make_track, process_data):
+    track = make_track(style_names=(b"Default", b"Sign"))
+
+    track.add_events([0, 10], [5, 5], [1, 0], ["a", "b"])
+    assert track.events_array["Style"].tolist() == [1, 0]
+
+    with pytest.raises(LibassError):
+        track.add_events([0], [5], [2], ["c"])
+    with pytest.raises(LibassError):
+        track.add_events([0], [5], [-1], ["c"])
+
+
+def test_add_events_invalid(make_track, process_data):
+    track = make_track(style_names=(b"Default",))
+
+    with pytest.raises(LibassError):
+        track.add_events([0], [5], ["Missing"], ["a"])
+    with pytest.raises(LibassError):
+        track.add_events([0], [5], ["Default"], ["a\nb"])
+    with pytest.raises(LibassError):
+        track.add_events([0], [5], ["Default"], ["a"], names=["x,y"])
+    with pytest.raises(LibassError):
+        track.add_events([0, 1], [5], ["Default"] * 2, ["a", "b"])
+    with pytest.raises(LibassError):
+        make_track(style_names=()).add_events([0], [5], [0], ["a"])
+    assert not process_data
+    assert len(track.events_array) == 0
+
+
+def test_add_events_restores_event_format(make_track, process_data):
+    track = make_track()
+    track.track[0].event_format = b"Marked, Start, End, Style, Text"
+
+    track.add_events([0], [5], ["Default"], ["a"])
+    assert process_data[0].startswith(b"[Events]\nFormat: Layer, Start")
+    assert track.event_format == b"Marked, Start, End, Style, Text"
+
+
+@pytest.fixture
+def process_chunk(monkeypatch):
+    """Replace ass_process_chunk with a parser dropping repeated ReadOrder
+    values, as with ass_set_check_readorder(1).
+    """
+    state = {"processed": [], "seen": set(), "fail": None, "delay": 0}
+
+    def fake(track_pointer, pointer, size, timecode, duration):
+        data = ctypes.string_at(pointer, size)
+        if state["delay"]:
+            time.sleep(state["delay"])
+        if data == state["fail"]:
+            raise ValueError("bad chunk")
+        state["processed"].append(data)
+        read_order = int(data.split(b",", 1)[0])
+        track = track_pointer[0]
+        if read_order not in state["seen"]:
+            state["seen"].add(read_order)
+            event = track.events[track.n_events]
+            event.Start = timecode
+            event.Duration = duration
+            track.n_events += 1
+
+    monkeypatch.setattr(libass, "ass_process_chunk", fake)
+    return state
+
+
+def chunk(read_order):
+    return b"%d,0,Default,,0,0,0,,text" % read_order
+
+
+def test_process_chunks(make_track, process_chunk):
+    track = make_track()
+    track.event_index
+
+    dropped = track.process_chunks(
+        [
+            (chunk(0), 0, 10),
+            (bytearray(chunk(1)), 10, 10),
+            (chunk(0), 20, 10),
+            (memoryview(chunk(2)), 30, 10),
+            (chunk(1).decode(), 40, 10),
+        ]
+    )
+
+    assert dropped == [0, 1]
+    assert track.events_array["Start"].tolist() == [0, 10, 30]
+    assert track._event_index is None
+
+
+async def produce(chunks, log=None, error=None):
+    for item in chunks:
+        if log is not None:
+            log.append(item[0])
+        yield item
+    if error is not None:
+        # Let the consumer start parsing before failing
+        await asyncio.sleep(0.01)
+        raise error
+
+
+def test_process_chunks_async(make_track, process_chunk):
+    track = make_track(capacity=256)
+    chunks = [(chunk(i % 150), i, 1) for i in range(200)]
+
+    dropped = asyncio.run(track.process_chunks_async(produce(chunks), 16))
+
+    assert dropped == list(range(50))
+    assert len(process_chunk["processed"]) == 200
+    assert track.events_array["Start"].tolist() == list(range(150))
+
+
+def test_process_chunks_async_max_pending(make_track, process_chunk):
+    track = make_track(capacity=256)
+    process_chunk["delay"] = 0.0005
+    produced = []
+    gaps = []
+
+    async def watch():
+        async for item in produce(
+            [(chunk(i), i, 1) for i in range(200)], produced
+        ):
+            gaps.append(len(produced) - len(process_chunk["processed"]))
+            yield item
+
+    asyncio.run(track.process_chunks_async(watch(), max_pending=8))
+
+    assert len(process_chunk["processed"]) == 200
+    # The queue, the batch being parsed and the chunk waiting to be queued
+    assert max(gaps) <= 2 * 8 + 1
+
+
+def test_process_chunks_async_consumer_error(make_track, process_chunk):
+    track = make_track(capacity=256)
+    process_chunk["fail"] = chunk(3)
+    produced = []
+
+    with pytest.raises(ValueError):
+        asyncio.run(
+            track.process_chunks_async(
+                produce([(chunk(i), i, 1) for i in range(100)], produced),
+                max_pending=4,
+            )
+        )
+
+    assert process_chunk["processed"] == [chunk(i) for i in range(3)]
+    # The iterable is not consumed any further once the consumer failed
+    assert len(produced) < 100
+
+
+def test_process_chunks_async_waits_for_batch(make_track, process_chunk):
+    track = make_track()
+    process_chunk["delay"] = 0.1
+
+    with pytest.raises(KeyError):
+        asyncio.run(
+            track.process_chunks_async(
+                produce([(chunk(0), 0, 1)], error=KeyError("source"))
+            )
+        )
+
+    # The batch running on the executor was completed before returning
+    assert process_chunk["processed"] == [chunk(0)]
+    assert track.track[0].n_events == 1
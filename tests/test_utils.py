@@ -0,0 +1,64 @@
+import ctypes
+import mmap
+
+import numpy
+import pytest
+
+from ass.utils import LibassError, get_buffer_pointer
+
+
+def read(pointer, size):
+    return ctypes.string_at(pointer, size)
+
+
+@pytest.mark.parametrize(
+    "buf",
+    [
+        "text",
+        b"text",
+        bytearray(b"text"),
+        memoryview(b"text"),
+        numpy.frombuffer(b"text", numpy.uint8),
+        numpy.array([[ord("t"), ord("e")], [ord("x"), ord("t")]], "u1"),
+    ],
+)
+def test_buffer_types(buf):
+    pointer, size, owner = get_buffer_pointer(buf)
+    assert size == 4
+    assert read(pointer, size) == b"text"
+
+
+def test_no_copy():
+    buf = bytearray(b"text")
+    pointer, size, owner = get_buffer_pointer(buf)
+
+    buf[0] = ord("n")
+    assert read(pointer, size) == b"next"
+    del pointer, owner
+
+    buf = b"text"
+    pointer, size, owner = get_buffer_pointer(buf)
+    assert owner is buf
+
+
+def test_mmap(tmp_path):
+    path = tmp_path / "sub.ass"
+    path.write_bytes(b"[Script Info]\n")
+
+    with open(str(path), "rb") as f:
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    pointer, size, owner = get_buffer_pointer(buf)
+    assert read(pointer, size) == b"[Script Info]\n"
+
+    # The memory is exported while the owner is alive
+    with pytest.raises(BufferError):
+        buf.close()
+    del pointer, owner
+    buf.close()
+
+
+def test_non_contiguous():
+    with pytest.raises(LibassError):
+        get_buffer_pointer(memoryview(b"text")[::2])
+    with pytest.raises(LibassError):
+        get_buffer_pointer(numpy.zeros((4, 4), numpy.uint8)[:, 1])